@@ -1,16 +1,17 @@
 import os
-import sqlalchemy
+import time
 from dotenv import load_dotenv
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from database import SessionLocal
 from dependencies import get_db
 from datetime import datetime, timedelta, timezone
-import crud
+import crud, crud_async
+from cache import CachedUser, token_version_cache, user_cache
+from workers import BoundedExecutor
+import instrumentation
 
 
 load_dotenv()
@@ -18,12 +19,43 @@ load_dotenv()
 SECRET_KEY = os.environ.get('SECRET_KEY') 
 ALGORITHM = os.environ.get('ALGORITHM')
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES'))
+# "subject": users are looked up by username per request
+# "claims": token also carries the role, so authorization needs no user
+# lookup, only a cached version check
+# Both formats carry the user_id and token version.
+TOKEN_FORMAT = os.environ.get('TOKEN_FORMAT', 'subject')
+
+# Built on first use: importing passlib and loading the bcrypt backend is
+# the slowest part of importing the app
+_pwd_context = None
+
+def get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login/")
 
+# bcrypt runs in this pool so it never blocks the event loop
+password_pool = BoundedExecutor(
+    kind=os.environ.get('PASSWORD_POOL_KIND', 'thread'),
+    max_workers=int(os.environ.get('PASSWORD_POOL_WORKERS', 0)) or None,
+    max_in_flight=int(os.environ.get('PASSWORD_POOL_MAX_IN_FLIGHT', 0)) or None,
+)
+
+def hash_password(password):
+    return get_pwd_context().hash(password)
+
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+async def hash_password_async(password: str):
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    return await password_pool.run(verify_password, plain_password, hashed_password)
 
 def authenticate_user(db: Session, username:str, password:str):
     user=crud.check_username(db,username)
@@ -31,6 +63,12 @@ def authenticate_user(db: Session, username:str, password:str):
         return False
     return user
 
+async def authenticate_user_async(db: Session, username:str, password:str):
+    user=await crud_async.check_username(db,username)
+    if not user or not await verify_password_async(password, user.hashed_password):
+        return False
+    return user
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -41,7 +79,23 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+# Claims to put in the access token for a user. Every token carries the
+# user_id and token version: revoke-tokens applies in both formats, and a
+# username freed by a rename cannot be reused to pass as its new owner.
+def token_data(user) -> dict:
+    data = {"sub": user.username, "uid": user.user_id, "ver": user.token_version}
+    if TOKEN_FORMAT == "claims":
+        data["role"] = user.role
+    return data
+
+async def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+    started = time.perf_counter()
+    try:
+        return await _get_current_user(db, token)
+    finally:
+        instrumentation.record_auth_time(time.perf_counter() - started)
+
+async def _get_current_user(db: Session, token: str):
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
@@ -54,8 +108,41 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = crud.check_username(db, username=username)
+    # Tokens issued before user_id and version were added cannot be tied to
+    # one account, so they are refused
+    user_id = payload.get("uid")
+    if user_id is None or "ver" not in payload:
+        raise credentials_exception
+    if "role" in payload:
+        return await _user_from_claims(db, payload, username, credentials_exception)
+    user = user_cache.get(username)
     if user is None:
+        db_user = await crud_async.check_username(db, username=username)
+        if db_user is None:
+            raise credentials_exception
+        user = CachedUser.from_orm(db_user)
+        user_cache.set(username, user)
+        token_version_cache.set(user.user_id, db_user.token_version)
+    # The username may now belong to someone else
+    if user.user_id != user_id:
+        raise credentials_exception
+    if payload["ver"] != await _current_token_version(db, user_id):
         raise credentials_exception
     return user
 
+# Fast path for claims tokens: trust the signed claims, only check that the
+# token version has not been bumped since the token was issued
+async def _user_from_claims(db: Session, payload: dict, username: str, credentials_exception: HTTPException):
+    user_id = payload["uid"]
+    if payload["ver"] != await _current_token_version(db, user_id):
+        raise credentials_exception
+    return CachedUser(user_id=user_id, username=username, role=payload.get("role"))
+
+# None when the user no longer exists
+async def _current_token_version(db: Session, user_id: int) -> Optional[int]:
+    current_version = token_version_cache.get(user_id)
+    if current_version is None:
+        current_version = await crud_async.get_token_version(db, user_id=user_id)
+        if current_version is not None:
+            token_version_cache.set(user_id, current_version)
+    return current_version
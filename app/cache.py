@@ -0,0 +1,262 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+
+# In-process TTL + LRU cache
+# =============================================================
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Authenticated user cache
+# =============================================================
+# Snapshot of the fields handlers read from the current user, so no ORM
+# instance is shared between requests. Users built from token claims carry
+# no email or full_name.
+@dataclass(frozen=True)
+class CachedUser:
+    user_id: int
+    username: str
+    role: str
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+
+    @classmethod
+    def from_orm(cls, user) -> "CachedUser":
+        return cls(
+            user_id=user.user_id,
+            username=user.username,
+            role=user.role,
+            email=user.email,
+            full_name=user.full_name,
+        )
+
+
+# Keyed by token subject (username)
+user_cache = TTLCache(
+    maxsize=int(os.environ.get('USER_CACHE_MAXSIZE', 10000)),
+    ttl=float(os.environ.get('USER_CACHE_TTL_SECONDS', 60)),
+)
+
+# Current token_version per user_id, for claims tokens. The TTL bounds how
+# long a revoked token keeps working on other workers.
+token_version_cache = TTLCache(
+    maxsize=int(os.environ.get('USER_CACHE_MAXSIZE', 10000)),
+    ttl=float(os.environ.get('TOKEN_VERSION_CACHE_TTL_SECONDS', 30)),
+)
+
+
+# Shared cache backends
+# =============================================================
+# Backends store plain dicts under string keys.
+class MemoryBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: dict, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    def delete(self, *keys: str) -> None:
+        self._cache.invalidate(*keys)
+
+# Works with any client exposing redis-py's get/set(ex=)/delete
+class RedisBackend:
+    def __init__(self, client, prefix: str = "assignments:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[dict]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: dict, ttl: float) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+# In-memory stand-in for a Redis client, for tests and local runs
+class FakeRedis:
+    def __init__(self):
+        self._data: dict[str, tuple[Optional[float], str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ex if ex else None, value)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+def make_backend(kind: str, maxsize: int, ttl: float):
+    if kind == "memory":
+        return MemoryBackend(maxsize=maxsize, ttl=ttl)
+    if kind == "redis":
+        import redis
+        return RedisBackend(redis.Redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0')))
+    if kind == "fake":
+        return RedisBackend(FakeRedis())
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+# Course lookup cache
+# =============================================================
+@dataclass(frozen=True)
+class CachedCourse:
+    course_id: int
+    course_name: str
+    course_code: str
+    description: Optional[str]
+    lecturer_id: int
+
+    @classmethod
+    def from_orm(cls, course) -> "CachedCourse":
+        return cls(
+            course_id=course.course_id,
+            course_name=course.course_name,
+            course_code=course.course_code,
+            description=course.description,
+            lecturer_id=course.lecturer_id,
+        )
+
+class CourseCache:
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Guards the counters only; backend calls may do network I/O
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def id_key(course_id: int) -> str:
+        return f"course:id:{course_id}"
+
+    @staticmethod
+    def code_key(course_code: str) -> str:
+        return f"course:code:{course_code}"
+
+    def _get(self, key: str) -> Optional[CachedCourse]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return CachedCourse(**value)
+
+    def get_by_id(self, course_id: int) -> Optional[CachedCourse]:
+        return self._get(self.id_key(course_id))
+
+    def get_by_code(self, course_code: str) -> Optional[CachedCourse]:
+        return self._get(self.code_key(course_code))
+
+    def set(self, course: CachedCourse) -> None:
+        value = course.__dict__.copy()
+        self.backend.set(self.id_key(course.course_id), value, self.ttl)
+        self.backend.set(self.code_key(course.course_code), value, self.ttl)
+
+    def invalidate(self, course_id: Optional[int] = None, *course_codes: str) -> None:
+        keys = [self.code_key(code) for code in course_codes if code]
+        if course_id is not None:
+            keys.append(self.id_key(course_id))
+        self.backend.delete(*keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+
+# COURSE_CACHE_BACKEND: memory (per process, default), redis (shared between workers) or fake
+COURSE_CACHE_TTL_SECONDS = float(os.environ.get('COURSE_CACHE_TTL_SECONDS', 300))
+course_cache = CourseCache(
+    make_backend(
+        os.environ.get('COURSE_CACHE_BACKEND', 'memory'),
+        maxsize=int(os.environ.get('COURSE_CACHE_MAXSIZE', 10000)),
+        ttl=COURSE_CACHE_TTL_SECONDS,
+    ),
+    ttl=COURSE_CACHE_TTL_SECONDS,
+)
@@ -1,6 +1,15 @@
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Optional
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, delete, exists, func, insert, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, contains_eager, joinedload
 import schemas, model
+from cache import CachedCourse, course_cache, token_version_cache, user_cache
+from jobs import job_queue
 
 #User CRUD
 # ==========================================================
@@ -16,6 +25,7 @@ def Sign_up(db: Session, user: schemas.UserCreate, hashed_password: str):
    db.add(db_user)
    db.commit()
    db.refresh(db_user)
+   job_queue.publish("user.created", {"user_id": db_user.user_id})
    return db_user
 
 # Get User by Email
@@ -26,21 +36,52 @@ def check_email(db: Session, email:str):
 def check_username(db: Session, username:str):
    return db.query(model.Users).filter(model.Users.username == username).first()
 
+# Check whether an email and/or username is already taken, in one query that
+# only reads those two columns. Returns (email_taken, username_taken).
+def find_signup_conflicts(db: Session, email: str, username: str):
+   rows = db.execute(
+      select(model.Users.email, model.Users.username)
+      .where(or_(model.Users.email == email, model.Users.username == username))
+      .limit(2)
+   ).all()
+   return any(row.email == email for row in rows), any(row.username == username for row in rows)
+
 #Edit User Profile
 def UpdateUser(db: Session, email:str, updateUser: schemas.UserUpdate):
    user = db.query(model.Users).filter(model.Users.email==email).first()
    if not user:
       raise HTTPException(status_code=404, detail="User Not Found")
    
+   old_username = user.username
    user.username = updateUser.username
    user.full_name = updateUser.full_name
    user.email = updateUser.email
+   # Claims tokens trust the username they carry, so a rename revokes them
+   if user.username != old_username:
+      user.token_version = model.Users.token_version + 1
 
    db.commit()
    db.refresh(user)
+   # Drop cached identities for both the old and new username
+   user_cache.invalidate(old_username, user.username)
+   token_version_cache.invalidate(user.user_id)
 
    return user
 
+# Get a user's current token version (single column lookup)
+def get_token_version(db: Session, user_id: int):
+   return db.scalar(select(model.Users.token_version).where(model.Users.user_id == user_id))
+
+# Revoke every token issued to a user
+def revoke_tokens(db: Session, user_id: int):
+   db.execute(
+      update(model.Users)
+      .where(model.Users.user_id == user_id)
+      .values(token_version=model.Users.token_version + 1)
+   )
+   db.commit()
+   token_version_cache.invalidate(user_id)
+
 # Course Crud 
 # =============================================================
 # Create Course 
@@ -52,32 +93,184 @@ def create_new_course(db: Session, course: schemas.RegisterCourse, lecturer_id:
         lecturer_id=lecturer_id
     )
     db.add(db_course)
+    if DASHBOARD_SUMMARY:
+        db.flush()
+        db.add(model.CourseStats(course_id=db_course.course_id))
     db.commit()
     db.refresh(db_course)
+    course_cache.invalidate(db_course.course_id, db_course.course_code)
+    job_queue.publish("course.created", {"course_id": db_course.course_id})
     return db_course
 
 # Get All Courses
 def get_all_courses(db: Session):
     return db.query(model.Course).all()
+
+# Smallest string greater than every string starting with prefix, or None if
+# the prefix is all U+10FFFF and there is no such string
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+    next_char = ord(stripped[-1]) + 1
+    # Surrogates cannot be encoded for the driver; skip to the next valid code point
+    if 0xD800 <= next_char <= 0xDFFF:
+        next_char = 0xE000
+    return stripped[:-1] + chr(next_char)
+
+def _filter_courses_page(query, limit: int, after_id: Optional[int], lecturer_id: Optional[int], code_prefix: Optional[str]):
+    if lecturer_id is not None:
+        query = query.filter(model.Course.lecturer_id == lecturer_id)
+    if code_prefix:
+        # Range predicate instead of LIKE so the course_code index is used on every backend
+        query = query.filter(model.Course.course_code >= code_prefix)
+        upper_bound = _prefix_upper_bound(code_prefix)
+        if upper_bound is not None:
+            query = query.filter(model.Course.course_code < upper_bound)
+    if after_id is not None:
+        query = query.filter(model.Course.course_id > after_id)
+    return query.order_by(model.Course.course_id).limit(limit + 1)
+
+# Get one page of courses ordered by course_id (keyset pagination)
+# Returns the page and the cursor for the next one (None on the last page)
+def get_courses_page(db: Session, limit: int, after_id: Optional[int] = None, lecturer_id: Optional[int] = None, code_prefix: Optional[str] = None):
+    courses = _filter_courses_page(db.query(model.Course), limit, after_id, lecturer_id, code_prefix).all()
+    if len(courses) > limit:
+        return courses[:limit], courses[limit - 1].course_id
+    return courses, None
+
+# Same page as plain rows of the CourseResponse columns, without building ORM objects
+def get_course_rows_page(db: Session, limit: int, after_id: Optional[int] = None, lecturer_id: Optional[int] = None, code_prefix: Optional[str] = None):
+    stmt = select(
+        model.Course.course_id,
+        model.Course.course_name,
+        model.Course.course_code,
+        model.Course.description,
+    )
+    rows = db.execute(_filter_courses_page(stmt, limit, after_id, lecturer_id, code_prefix)).all()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].course_id
+    return rows, None
+
+# Course search
+# =============================================================
+# Ranked keyword search over the full-text index created by
+# migrations.create_search_index. Every term must match, the last one as a
+# prefix so partial words work while typing. Returns (rows, next_offset).
+# Pages are OFFSET-based and stop at SEARCH_MAX_OFFSET: ranked results that
+# deep are not worth the growing OFFSET cost, so clients refine the query.
+SEARCH_MAX_TERMS = 8
+SEARCH_MAX_OFFSET = 1000
+
+SQLITE_SEARCH = text("""
+    SELECT c.course_id, c.course_name, c.course_code, c.description, c.lecturer_id
+    FROM courses_fts JOIN courses AS c ON c.course_id = courses_fts.rowid
+    WHERE courses_fts MATCH :query
+    ORDER BY bm25(courses_fts, 5.0, 10.0, 1.0), c.course_id
+    LIMIT :limit OFFSET :offset
+""")
+
+POSTGRES_SEARCH = text("""
+    SELECT c.course_id, c.course_name, c.course_code, c.description, c.lecturer_id
+    FROM courses AS c, to_tsquery('english', :query) AS query
+    WHERE c.search_vector @@ query
+    ORDER BY ts_rank(c.search_vector, query) DESC, c.course_id
+    LIMIT :limit OFFSET :offset
+""")
+
+MYSQL_SEARCH = text("""
+    SELECT course_id, course_name, course_code, description, lecturer_id,
+           MATCH(course_name, course_code, description) AGAINST (:query IN BOOLEAN MODE) AS score
+    FROM courses
+    WHERE MATCH(course_name, course_code, description) AGAINST (:query IN BOOLEAN MODE)
+    ORDER BY score DESC, course_id
+    LIMIT :limit OFFSET :offset
+""")
+
+def _search_terms(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())[:SEARCH_MAX_TERMS]
+
+def search_courses(db: Session, q: str, limit: int, offset: int = 0):
+    terms = _search_terms(q)
+    if not terms:
+        return [], None
+    params = {"limit": limit + 1, "offset": offset}
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        params["query"] = " ".join(f'"{term}"' for term in terms) + "*"
+        rows = db.execute(SQLITE_SEARCH, params).all()
+    elif dialect == "postgresql":
+        params["query"] = " & ".join(terms) + ":*"
+        rows = db.execute(POSTGRES_SEARCH, params).all()
+    elif dialect in ("mysql", "mariadb"):
+        params["query"] = " ".join(f"+{term}" for term in terms) + "*"
+        rows = db.execute(MYSQL_SEARCH, params).all()
+    else:
+        # No full-text support: unranked substring match
+        conditions = [
+            or_(
+                model.Course.course_name.ilike(f"%{term}%"),
+                model.Course.course_code.ilike(f"%{term}%"),
+                model.Course.description.ilike(f"%{term}%"),
+            )
+            for term in terms
+        ]
+        stmt = select(
+            model.Course.course_id,
+            model.Course.course_name,
+            model.Course.course_code,
+            model.Course.description,
+            model.Course.lecturer_id,
+        ).where(and_(*conditions)).order_by(model.Course.course_id).limit(limit + 1).offset(offset)
+        rows = db.execute(stmt).all()
+    if len(rows) > limit:
+        next_offset = offset + limit
+        return rows[:limit], next_offset if next_offset <= SEARCH_MAX_OFFSET else None
+    return rows, None
+
 # Get Course by ID
+# Read-through course_cache, returns a CachedCourse snapshot rather than an ORM row.
+# Only primary reads fill the cache: a lagging replica's row would otherwise be
+# served to everyone, including clients routed to the primary to read their writes.
 def get_course_by_id(db: Session, course_id: int):
-    return db.query(model.Course).filter(model.Course.course_id == course_id).first()
+    course = course_cache.get_by_id(course_id)
+    if course is None:
+        db_course = db.query(model.Course).filter(model.Course.course_id == course_id).first()
+        if db_course is None:
+            return None
+        course = CachedCourse.from_orm(db_course)
+        if not db.info.get("replica"):
+            course_cache.set(course)
+    return course
  
 # Get course by course code 
+# Read-through course_cache, returns a CachedCourse snapshot rather than an ORM row
 def get_course_by_code(db: Session, course_code: str):
-    return db.query(model.Course).filter(model.Course.course_code == course_code).first()
+    course = course_cache.get_by_code(course_code)
+    if course is None:
+        db_course = db.query(model.Course).filter(model.Course.course_code == course_code).first()
+        if db_course is None:
+            return None
+        course = CachedCourse.from_orm(db_course)
+        if not db.info.get("replica"):
+            course_cache.set(course)
+    return course
 
 # Update Course by ID
 def update_course(db: Session, course_id: int, course_update: schemas.CourseUpdate):
       db_course = db.query(model.Course).filter(model.Course.course_id == course_id).first()
       if not db_course:
          raise HTTPException(status_code=404, detail="Course not found")
+      old_code = db_course.course_code
       db_course.course_name = course_update.course_name if course_update.course_name else db_course.course_name
       db_course.course_code = course_update.course_code if course_update.course_code else db_course.course_code
       db_course.description = course_update.description if course_update.description else db_course.description
+      db_course.revision = model.Course.revision + 1
       
       db.commit()
       db.refresh(db_course)
+      course_cache.invalidate(db_course.course_id, old_code, db_course.course_code)
+      job_queue.publish("course.updated", {"course_id": db_course.course_id})
       return db_course
 
 # Update course by course code
@@ -85,44 +278,326 @@ def update_course_by_code(db: Session, course_code: str, course_update: schemas.
     db_course = db.query(model.Course).filter(model.Course.course_code == course_code).first()
     if not db_course:
         raise HTTPException(status_code=404, detail="Course not found")
+    old_code = db_course.course_code
     db_course.course_name = course_update.course_name if course_update.course_name else db_course.course_name
     db_course.course_code = course_update.course_code if course_update.course_code else db_course.course_code
     db_course.description = course_update.description if course_update.description else db_course.description
+    db_course.revision = model.Course.revision + 1
     
     db.commit()
     db.refresh(db_course)
+    course_cache.invalidate(db_course.course_id, old_code, db_course.course_code)
+    job_queue.publish("course.updated", {"course_id": db_course.course_id})
     return db_course
 
+# Check whether a user is enrolled in a course (EXISTS, no row loaded)
+def enrollment_exists(db: Session, user_id: int, course_id: int):
+    return db.scalar(select(exists().where(
+        model.Enrollment.user_id == user_id,
+        model.Enrollment.course_id == course_id
+    )))
+
+# INSERT into enrollments that skips rows hitting the (user_id, course_id) unique index
+def _enrollment_insert(db: Session):
+   dialect = db.get_bind().dialect.name
+   if dialect == "postgresql":
+      from sqlalchemy.dialects.postgresql import insert as pg_insert
+      return pg_insert(model.Enrollment).on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+   if dialect == "sqlite":
+      from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+      return sqlite_insert(model.Enrollment).on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+   if dialect in ("mysql", "mariadb"):
+      return insert(model.Enrollment).prefix_with("IGNORE")
+   return insert(model.Enrollment)
+
 #Enroll in a course
+# Single insert-or-conflict statement, returns False if already enrolled
 def new_enroll(db: Session, user_id: int, course_id: int):
-   db_enroll = model.Enrollment (
-      user_id = user_id,
-      course_id = course_id
+   try:
+      result = db.execute(_enrollment_insert(db).values(user_id=user_id, course_id=course_id))
+      if result.rowcount == 1:
+         bump_course_stats(db, course_id, enrollments=1)
+      db.commit()
+   except IntegrityError:
+      db.rollback()
+      return False
+   if result.rowcount != 1:
+      return False
+   job_queue.publish("enrollment.created", {"user_id": user_id, "course_id": course_id})
+   return True
 
-   )
-   db.add(db_enroll)
-   db.commit()
-   db.refresh(db_enroll)
-   return db_enroll
+# Bulk enroll a cohort in a course
+# Users are resolved and existing enrollments checked with set-based queries,
+# new rows are inserted in batches and everything is committed once.
+# Returns (user_id, username, status) per requested user, status being
+# "enrolled", "already_enrolled" or "not_found".
+BULK_ENROLL_BATCH_SIZE = 500
+
+def _batches(items: list, size: int = BULK_ENROLL_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def bulk_enroll(db: Session, course_id: int, user_ids: list[int], usernames: list[str]):
+    user_ids = list(dict.fromkeys(user_ids))
+    usernames = list(dict.fromkeys(usernames))
+
+    username_by_id = {}
+    id_by_username = {}
+    lookups = [model.Users.user_id.in_(batch) for batch in _batches(user_ids)]
+    lookups += [model.Users.username.in_(batch) for batch in _batches(usernames)]
+    for condition in lookups:
+        for row in db.execute(select(model.Users.user_id, model.Users.username).where(condition)):
+            username_by_id[row.user_id] = row.username
+            id_by_username[row.username] = row.user_id
+
+    found_ids = list(username_by_id)
+    already_enrolled = set()
+    for batch in _batches(found_ids):
+        already_enrolled.update(db.scalars(
+            select(model.Enrollment.user_id).where(
+                model.Enrollment.course_id == course_id,
+                model.Enrollment.user_id.in_(batch)
+            )
+        ))
+
+    to_enroll = [user_id for user_id in found_ids if user_id not in already_enrolled]
+    # Only rows actually inserted count; a concurrent enroll makes ON CONFLICT skip the rest
+    inserted = []
+    if db.get_bind().dialect.insert_returning:
+        for batch in _batches(to_enroll):
+            inserted += db.scalars(
+                _enrollment_insert(db)
+                .values([{"user_id": user_id, "course_id": course_id} for user_id in batch])
+                .returning(model.Enrollment.user_id)
+            )
+    else:
+        # No RETURNING (MySQL): the per-row rowcount tells which inserts were skipped
+        for user_id in to_enroll:
+            if db.execute(_enrollment_insert(db).values(user_id=user_id, course_id=course_id)).rowcount == 1:
+                inserted.append(user_id)
+    bump_course_stats(db, course_id, enrollments=len(inserted))
+    db.commit()
+    if inserted:
+        job_queue.publish("enrollment.bulk_created", {"course_id": course_id, "user_ids": inserted})
+
+    # One result per user, even when requested both by id and by username
+    inserted = set(inserted)
+    results = []
+    seen = set()
+    requested = [(user_id, username_by_id.get(user_id)) for user_id in user_ids]
+    requested += [(id_by_username.get(username), username) for username in usernames]
+    for user_id, username in requested:
+        if user_id is None or username is None:
+            status = "not_found"
+        elif user_id in seen:
+            continue
+        elif user_id in inserted:
+            status = "enrolled"
+        else:
+            status = "already_enrolled"
+        seen.add(user_id)
+        results.append((user_id, username, status))
+    return results
 
 # Get Enrollments by User ID
 def get_enrollments_by_user_id(db: Session, user_id: int):
     return db.query(model.Enrollment).filter(model.Enrollment.user_id == user_id).all()
 
+# Get the EnrollResponse course columns for a user's enrollments as plain rows
+def get_enrollment_rows(db: Session, user_id: int):
+    return db.execute(
+        select(model.Course.course_name, model.Course.course_code, model.Course.lecturer_id)
+        .join(model.Enrollment, model.Enrollment.course_id == model.Course.course_id)
+        .where(model.Enrollment.user_id == user_id)
+    ).all()
+
+# Get Enrollments with their Courses by User ID (one joined query instead of a course lookup per enrollment)
+def get_enrollments_with_courses(db: Session, user_id: int):
+    return (
+        db.query(model.Enrollment)
+        .join(model.Enrollment.course)
+        .options(contains_eager(model.Enrollment.course))
+        .filter(model.Enrollment.user_id == user_id)
+        .all()
+    )
+
 # Unenroll from a course
+# Single DELETE statement, 404 if there was nothing to delete
 def unenroll_from_course(db: Session, user_id: int, course_id: int):
-    enrollment = db.query(model.Enrollment).filter(
+    result = db.execute(delete(model.Enrollment).where(
         model.Enrollment.user_id == user_id,
         model.Enrollment.course_id == course_id
-    ).first()
-    
-    if not enrollment:
+    ))
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Enrollment not found")
     
-    db.delete(enrollment)
+    bump_course_stats(db, course_id, enrollments=-1)
     db.commit()
     return {"message": "Unenrolled successfully"}
 
+#Lecturer dashboard
+# =============================================================
+# DASHBOARD_SUMMARY=true serves the dashboard from the course_stats table,
+# which enroll, unenroll and assignment creation keep up to date in the same
+# transaction. Otherwise it is computed by the grouped query below.
+DASHBOARD_SUMMARY = os.environ.get('DASHBOARD_SUMMARY', 'false').lower() in ('1', 'true', 'yes')
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# Per-course enrollment count, assignment count and next due date for a
+# lecturer, as one statement with grouped subqueries (no row fan-out)
+def _dashboard_query(lecturer_id: int, course_ids: Optional[list[int]] = None):
+    now = _utcnow()
+    enrollment_counts = select(
+        model.Enrollment.course_id,
+        func.count().label("enrollment_count"),
+    ).join(model.Course, model.Enrollment.course_id == model.Course.course_id
+    ).where(model.Course.lecturer_id == lecturer_id
+    ).group_by(model.Enrollment.course_id).subquery()
+    assignment_stats = select(
+        model.Assignment.course_id,
+        func.count().label("assignment_count"),
+        func.min(case((model.Assignment.due_date >= now, model.Assignment.due_date))).label("next_due_date"),
+    ).join(model.Course, model.Assignment.course_id == model.Course.course_id
+    ).where(model.Course.lecturer_id == lecturer_id
+    ).group_by(model.Assignment.course_id).subquery()
+    stmt = select(
+        model.Course.course_id,
+        model.Course.course_code,
+        model.Course.course_name,
+        func.coalesce(enrollment_counts.c.enrollment_count, 0).label("enrollment_count"),
+        func.coalesce(assignment_stats.c.assignment_count, 0).label("assignment_count"),
+        assignment_stats.c.next_due_date,
+    ).outerjoin(enrollment_counts, enrollment_counts.c.course_id == model.Course.course_id
+    ).outerjoin(assignment_stats, assignment_stats.c.course_id == model.Course.course_id
+    ).where(model.Course.lecturer_id == lecturer_id
+    ).order_by(model.Course.course_id)
+    if course_ids is not None:
+        stmt = stmt.where(model.Course.course_id.in_(course_ids))
+    return stmt
+
+# Apply counter deltas to a course's summary row (no-op unless DASHBOARD_SUMMARY)
+# Runs inside the caller's transaction. A missing row is rebuilt on the next dashboard read.
+def bump_course_stats(db: Session, course_id: int, enrollments: int = 0, assignments: int = 0, due_date: Optional[datetime] = None):
+    if not DASHBOARD_SUMMARY or not (enrollments or assignments):
+        return
+    values = {"updated_at": func.now()}
+    if enrollments:
+        values["enrollment_count"] = model.CourseStats.enrollment_count + enrollments
+    if assignments:
+        values["assignment_count"] = model.CourseStats.assignment_count + assignments
+    if due_date is not None and due_date.replace(tzinfo=None) >= _utcnow():
+        due_date = due_date.replace(tzinfo=None)
+        values["next_due_date"] = case(
+            (or_(model.CourseStats.next_due_date.is_(None), model.CourseStats.next_due_date > due_date), due_date),
+            else_=model.CourseStats.next_due_date,
+        )
+    db.execute(update(model.CourseStats).where(model.CourseStats.course_id == course_id).values(**values))
+
+# Insert or overwrite summary rows in one statement, so two first reads of a
+# dashboard racing to create the same course_stats row do not conflict
+COURSE_STATS_COLUMNS = ["enrollment_count", "assignment_count", "next_due_date"]
+
+def _upsert_course_stats(db: Session, values: list[dict]):
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(model.CourseStats).values(values)
+        updates = {column: stmt.excluded[column] for column in COURSE_STATS_COLUMNS}
+        db.execute(stmt.on_conflict_do_update(index_elements=["course_id"], set_={**updates, "updated_at": func.now()}))
+    elif dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(model.CourseStats).values(values)
+        updates = {column: stmt.inserted[column] for column in COURSE_STATS_COLUMNS}
+        db.execute(stmt.on_duplicate_key_update(**updates, updated_at=func.now()))
+    else:
+        for value in values:
+            db.merge(model.CourseStats(**value))
+
+# Recompute summary rows from the base tables
+def refresh_course_stats(db: Session, lecturer_id: int, course_ids: list[int]):
+    rows = db.execute(_dashboard_query(lecturer_id, course_ids)).mappings().all()
+    if rows:
+        _upsert_course_stats(db, [
+            {"course_id": row["course_id"], **{column: row[column] for column in COURSE_STATS_COLUMNS}}
+            for row in rows
+        ])
+    db.commit()
+    return rows
+
+# Get the lecturer dashboard rows
+def get_lecturer_dashboard(db: Session, lecturer_id: int):
+    if not DASHBOARD_SUMMARY:
+        return db.execute(_dashboard_query(lecturer_id)).mappings().all()
+
+    rows = db.execute(
+        select(
+            model.Course.course_id,
+            model.Course.course_code,
+            model.Course.course_name,
+            model.CourseStats.course_id.label("stats_course_id"),
+            model.CourseStats.enrollment_count,
+            model.CourseStats.assignment_count,
+            model.CourseStats.next_due_date,
+        ).outerjoin(model.CourseStats, model.CourseStats.course_id == model.Course.course_id
+        ).where(model.Course.lecturer_id == lecturer_id
+        ).order_by(model.Course.course_id)
+    ).mappings().all()
+    # Rows that are missing, or whose next due date has passed, are recomputed
+    now = _utcnow()
+    stale = [
+        row["course_id"] for row in rows
+        if row["stats_course_id"] is None or (row["next_due_date"] is not None and row["next_due_date"] < now)
+    ]
+    if not stale:
+        return rows
+    refreshed = {row["course_id"]: row for row in refresh_course_stats(db, lecturer_id, stale)}
+    return [refreshed.get(row["course_id"], row) for row in rows]
+
+#Export queries
+# =============================================================
+# Rows are fetched in batches of EXPORT_BATCH_SIZE through a server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+COURSE_EXPORT_COLUMNS = ["course_id", "course_code", "course_name", "description", "lecturer_id", "created_at"]
+ENROLLMENT_EXPORT_COLUMNS = ["enrollment_id", "course_id", "course_code", "user_id", "username", "full_name", "email", "created_at"]
+
+# Stream all courses
+def stream_courses(db: Session):
+    stmt = select(
+        model.Course.course_id,
+        model.Course.course_code,
+        model.Course.course_name,
+        model.Course.description,
+        model.Course.lecturer_id,
+        model.Course.created_at,
+    ).order_by(model.Course.course_id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    yield from db.execute(stmt).mappings()
+
+# Stream enrollments joined to their user and course, all of them or only
+# those in one lecturer's courses
+def stream_enrollments(db: Session, lecturer_id: Optional[int] = None):
+    stmt = select(
+        model.Enrollment.enrollment_id,
+        model.Enrollment.course_id,
+        model.Course.course_code,
+        model.Enrollment.user_id,
+        model.Users.username,
+        model.Users.full_name,
+        model.Users.email,
+        model.Enrollment.created_at,
+    ).join(model.Users, model.Enrollment.user_id == model.Users.user_id
+    ).join(model.Course, model.Enrollment.course_id == model.Course.course_id)
+    if lecturer_id is not None:
+        stmt = stmt.where(model.Course.lecturer_id == lecturer_id)
+    stmt = stmt.order_by(model.Enrollment.enrollment_id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    yield from db.execute(stmt).mappings()
+
 #Assignment CRUD
 # =============================================================
 # Create Assignment Instructor only
@@ -135,12 +610,115 @@ def create_assignment(db: Session, assignment: schemas.AssignmentCreate, lecture
             due_date=assignment.due_date
       )
       db.add(db_assignment)
+      bump_course_stats(db, assignment.course_id, assignments=1, due_date=assignment.due_date)
       db.commit()
       db.refresh(db_assignment)
+      job_queue.publish("assignment.created", {
+         "assignment_id": db_assignment.assignment_id,
+         "course_id": db_assignment.course_id,
+         "due_date": db_assignment.due_date.isoformat(),
+      })
       return db_assignment
 
+# Upcoming deadlines across a student's enrolled courses, due in [start, end)
+# Keyset-paginated on (due_date, assignment_id); after is the last row of the previous page.
+# Returns the page and the (due_date, assignment_id) key of its last row if there is a next page.
+def _deadlines_in_window(stmt, user_id: int, start: datetime, end: datetime):
+    return stmt.select_from(model.Assignment).join(
+        model.Enrollment, model.Enrollment.course_id == model.Assignment.course_id
+    ).join(model.Course, model.Course.course_id == model.Assignment.course_id
+    ).where(
+        model.Enrollment.user_id == user_id,
+        model.Assignment.due_date >= start,
+        model.Assignment.due_date < end,
+    )
+
+# One aggregate row that changes whenever the feed content does: the set of
+# assignments in the window (assignments are immutable) and the revision of
+# their courses. Cheap enough to answer conditional GETs before the feed query.
+def get_deadlines_version(db: Session, user_id: int, start: datetime, end: datetime):
+    return tuple(db.execute(_deadlines_in_window(select(
+        func.count(),
+        func.min(model.Assignment.assignment_id),
+        func.max(model.Assignment.assignment_id),
+        func.sum(model.Assignment.assignment_id),
+        func.sum(model.Course.revision),
+    ), user_id, start, end)).one())
+
+def get_upcoming_deadlines(db: Session, user_id: int, start: datetime, end: datetime, limit: int, after: Optional[tuple[datetime, int]] = None):
+    stmt = _deadlines_in_window(select(
+        model.Assignment.assignment_id,
+        model.Assignment.course_id,
+        model.Course.course_code,
+        model.Course.course_name,
+        model.Assignment.assignment_title,
+        model.Assignment.due_date,
+    ), user_id, start, end)
+    if after is not None:
+        after_due, after_id = after
+        stmt = stmt.where(or_(
+            model.Assignment.due_date > after_due,
+            and_(model.Assignment.due_date == after_due, model.Assignment.assignment_id > after_id),
+        ))
+    rows = db.execute(
+        stmt.order_by(model.Assignment.due_date, model.Assignment.assignment_id).limit(limit + 1)
+    ).mappings().all()
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        return rows[:limit], (last["due_date"], last["assignment_id"])
+    return rows, None
+
 # Get Assignment by ID
 def get_assignment_by_id(db: Session, assignment_id: int):
     return db.query(model.Assignment).filter(model.Assignment.assignment_id == assignment_id).first()
 
+#Submission CRUD
+# =============================================================
+# Create or replace a student's submission for an assignment
+# One insert-or-update statement on the (assignment_id, user_id) unique index,
+# so concurrent resubmissions do not race. The replaced file's blob is kept
+# (see storage.py).
+SUBMISSION_FILE_COLUMNS = ["file_sha256", "filename", "content_type", "size"]
 
+def save_submission(db: Session, assignment_id: int, user_id: int, file_sha256: str, filename: str, content_type: str, size: int):
+    values = {
+        "assignment_id": assignment_id, "user_id": user_id, "file_sha256": file_sha256,
+        "filename": filename, "content_type": content_type, "size": size, "submitted_at": func.now(),
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(model.Submission).values(**values)
+        updates = {column: stmt.excluded[column] for column in SUBMISSION_FILE_COLUMNS}
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["assignment_id", "user_id"], set_={**updates, "submitted_at": func.now()},
+        ))
+    elif dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(model.Submission).values(**values)
+        updates = {column: stmt.inserted[column] for column in SUBMISSION_FILE_COLUMNS}
+        db.execute(stmt.on_duplicate_key_update(**updates, submitted_at=func.now()))
+    else:
+        db_submission = db.query(model.Submission).filter(
+            model.Submission.assignment_id == assignment_id,
+            model.Submission.user_id == user_id
+        ).first()
+        if db_submission is None:
+            db_submission = model.Submission(assignment_id=assignment_id, user_id=user_id)
+            db.add(db_submission)
+        for column, value in values.items():
+            setattr(db_submission, column, value)
+    db.commit()
+    return db.query(model.Submission).filter(
+        model.Submission.assignment_id == assignment_id,
+        model.Submission.user_id == user_id
+    ).one()
+
+# Get Submission by ID, with its assignment loaded for permission checks
+def get_submission_by_id(db: Session, submission_id: int):
+    return db.query(model.Submission).options(joinedload(model.Submission.assignment)).filter(
+        model.Submission.submission_id == submission_id
+    ).first()
@@ -0,0 +1,69 @@
+import functools
+from fastapi.concurrency import run_in_threadpool
+from database import DB_ASYNC, acquire_connection_slot
+import crud
+
+# sqlalchemy.ext.asyncio needs greenlet, so it is only imported in asyncio mode
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession
+else:
+    AsyncSession = None
+
+
+# Awaitable versions of the crud functions.
+# With an AsyncSession the query runs through the async driver via run_sync;
+# with a plain Session it runs in the threadpool, so handlers never block
+# the event loop in either mode.
+def _make_async(fn):
+    @functools.wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        if AsyncSession is not None and isinstance(db, AsyncSession):
+            return await db.run_sync(lambda session: fn(session, *args, **kwargs))
+        await acquire_connection_slot(db)
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+    return wrapper
+
+#User CRUD
+# ==========================================================
+Sign_up = _make_async(crud.Sign_up)
+check_email = _make_async(crud.check_email)
+check_username = _make_async(crud.check_username)
+find_signup_conflicts = _make_async(crud.find_signup_conflicts)
+UpdateUser = _make_async(crud.UpdateUser)
+get_token_version = _make_async(crud.get_token_version)
+revoke_tokens = _make_async(crud.revoke_tokens)
+
+# Course Crud
+# =============================================================
+create_new_course = _make_async(crud.create_new_course)
+get_all_courses = _make_async(crud.get_all_courses)
+get_courses_page = _make_async(crud.get_courses_page)
+get_course_rows_page = _make_async(crud.get_course_rows_page)
+search_courses = _make_async(crud.search_courses)
+get_course_by_id = _make_async(crud.get_course_by_id)
+get_course_by_code = _make_async(crud.get_course_by_code)
+update_course = _make_async(crud.update_course)
+update_course_by_code = _make_async(crud.update_course_by_code)
+enrollment_exists = _make_async(crud.enrollment_exists)
+new_enroll = _make_async(crud.new_enroll)
+bulk_enroll = _make_async(crud.bulk_enroll)
+get_enrollments_by_user_id = _make_async(crud.get_enrollments_by_user_id)
+get_enrollments_with_courses = _make_async(crud.get_enrollments_with_courses)
+get_enrollment_rows = _make_async(crud.get_enrollment_rows)
+unenroll_from_course = _make_async(crud.unenroll_from_course)
+
+#Lecturer dashboard
+# =============================================================
+get_lecturer_dashboard = _make_async(crud.get_lecturer_dashboard)
+
+#Assignment CRUD
+# =============================================================
+create_assignment = _make_async(crud.create_assignment)
+get_assignment_by_id = _make_async(crud.get_assignment_by_id)
+get_deadlines_version = _make_async(crud.get_deadlines_version)
+get_upcoming_deadlines = _make_async(crud.get_upcoming_deadlines)
+
+#Submission CRUD
+# =============================================================
+save_submission = _make_async(crud.save_submission)
+get_submission_by_id = _make_async(crud.get_submission_by_id)
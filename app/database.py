@@ -1,7 +1,12 @@
+import asyncio
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import declarative_base, sessionmaker
+from pool_stats import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
 
 load_dotenv()
 
@@ -11,8 +16,142 @@ if not SQLALCHEMY_DATABASE_URL:
     raise ValueError("No Database found")
 
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Connection pool settings
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', -1))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'false').lower() in ('1', 'true', 'yes')
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def pool_options(url: str, poolclass) -> dict:
+    parsed = make_url(url)
+    # In-memory SQLite uses a single shared connection, there is nothing to size
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {"pool_pre_ping": DB_POOL_PRE_PING}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+# Connection slots for request sessions
+# Sync sessions keep their connection across threadpool hops. A worker thread
+# blocked on an exhausted pool can be the thread a connection holder needs to
+# finish, and under load every thread ends up waiting. Request sessions
+# therefore wait on the event loop for one of the engine's
+# pool_size + max_overflow slots before their first query (see crud_async)
+# and give it back when closed, so checkouts do not block threads.
+connection_slots = {}
+
+def _pool_capacity(bind) -> Optional[int]:
+    if not isinstance(bind.pool, QueuePool) or DB_MAX_OVERFLOW < 0:
+        return None
+    return DB_POOL_SIZE + DB_MAX_OVERFLOW
+
+async def acquire_connection_slot(db) -> None:
+    if "connection_slot" in db.info:
+        return
+    slots = connection_slots.get(db.get_bind())
+    if slots is None:
+        return
+    await slots.acquire()
+    db.info["connection_slot"] = slots
+
+def release_connection_slot(db) -> None:
+    slots = db.info.pop("connection_slot", None)
+    if slots is not None:
+        slots.release()
+
+# Sessions are bound in init_engines(), so importing the app opens no
+# connections and loads no DB driver
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+# Asyncio mode: requests get an AsyncSession instead of a blocking Session
+DB_ASYNC = os.environ.get('DB_ASYNC', 'false').lower() in ('1', 'true', 'yes')
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+ASYNC_SQLALCHEMY_DATABASE_URL = os.environ.get('ASYNC_DB_URL') or to_async_url(SQLALCHEMY_DATABASE_URL)
+
+# Read replicas: comma-separated URLs in DB_REPLICA_URLS, used by read-only routes
+DB_REPLICA_URLS = [url.strip() for url in os.environ.get('DB_REPLICA_URLS', '').split(',') if url.strip()]
+
+# Bound to a replica engine per session. info["replica"] marks what they read
+# as possibly stale, so it is not put in shared caches.
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, info={"replica": True})
+
+AsyncSessionLocal = None
+AsyncReplicaSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    # Objects are read after commit outside the greenlet, so they must not expire
+    AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+    AsyncReplicaSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, info={"replica": True})
+
+# Filled in place by init_engines(), so importers can hold on to the lists
+replica_engines = []
+async_replica_engines = []
+
+engine = None
+async_engine = None
+
+# Build the engines and bind the session factories. Called from the app
+# lifespan and by scripts; safe to call more than once.
+def init_engines():
+    global engine, async_engine
+    if engine is not None:
+        return engine
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, **pool_options(SQLALCHEMY_DATABASE_URL, InstrumentedQueuePool))
+    SessionLocal.configure(bind=engine)
+    replica_engines.extend(
+        create_engine(url, **pool_options(url, InstrumentedQueuePool))
+        for url in DB_REPLICA_URLS
+    )
+    for bind in [engine, *replica_engines]:
+        capacity = _pool_capacity(bind)
+        if capacity is not None:
+            connection_slots[bind] = asyncio.Semaphore(capacity)
+    if DB_ASYNC:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        async_engine = create_async_engine(
+            ASYNC_SQLALCHEMY_DATABASE_URL,
+            **pool_options(ASYNC_SQLALCHEMY_DATABASE_URL, InstrumentedAsyncAdaptedQueuePool),
+        )
+        AsyncSessionLocal.configure(bind=async_engine)
+        async_replica_engines.extend(
+            create_async_engine(to_async_url(url), **pool_options(to_async_url(url), InstrumentedAsyncAdaptedQueuePool))
+            for url in DB_REPLICA_URLS
+        )
+    return engine
+
+async def dispose_engines():
+    global engine, async_engine
+    if async_engine is not None:
+        for replica in async_replica_engines:
+            await replica.dispose()
+        await async_engine.dispose()
+    if engine is not None:
+        for replica in replica_engines:
+            replica.dispose()
+        engine.dispose()
+    replica_engines.clear()
+    async_replica_engines.clear()
+    connection_slots.clear()
+    engine = None
+    async_engine = None
 
 Base = declarative_base()
@@ -1,12 +1,86 @@
-from fastapi import Depends
-from database import SessionLocal
+from fastapi import Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import OperationalError
+from database import (
+    DB_ASYNC,
+    acquire_connection_slot,
+    release_connection_slot,
+    SessionLocal,
+    AsyncSessionLocal,
+    ReplicaSessionLocal,
+    AsyncReplicaSessionLocal,
+    replica_engines,
+    async_replica_engines,
+)
 from sqlalchemy.orm import Session
+from replicas import ReplicaSet, wrote_recently
 
+replica_set = ReplicaSet(replica_engines)
+async_replica_set = ReplicaSet(async_replica_engines)
 
-def get_db():
+
+# Closed in the threadpool, as closing returns the connection to the pool
+async def get_sync_db(response: Response):
     db = SessionLocal()
+    if replica_set:
+        db.info["response"] = response
     try:
         yield db
     finally:
-        db.close()
-        
\ No newline at end of file
+        try:
+            await run_in_threadpool(db.close)
+        finally:
+            release_connection_slot(db)
+
+async def get_async_db(response: Response):
+    async with AsyncSessionLocal() as db:
+        if async_replica_set:
+            db.sync_session.info["response"] = response
+        yield db
+
+# Read-only session: a replica unless the client just wrote or none is reachable.
+# The fallback is the request's primary session (shared with get_db, e.g. the
+# one auth used), never a second one: two primary connections per request can
+# exhaust the pool with every request holding one and waiting for another.
+async def get_sync_read_db(request: Request, primary: Session = Depends(get_sync_db)):
+    if replica_set and not wrote_recently(request):
+        for engine in replica_set.candidates():
+            db = ReplicaSessionLocal(bind=engine)
+            await acquire_connection_slot(db)
+            try:
+                await run_in_threadpool(db.connection)
+            except OperationalError:
+                release_connection_slot(db)
+                await run_in_threadpool(db.close)
+                replica_set.mark_down(engine)
+                continue
+            try:
+                yield db
+            finally:
+                try:
+                    await run_in_threadpool(db.close)
+                finally:
+                    release_connection_slot(db)
+            return
+    yield primary
+
+async def get_async_read_db(request: Request, primary=Depends(get_async_db)):
+    if async_replica_set and not wrote_recently(request):
+        for engine in async_replica_set.candidates():
+            db = AsyncReplicaSessionLocal(bind=engine)
+            try:
+                await db.connection()
+            except OperationalError:
+                await db.close()
+                async_replica_set.mark_down(engine)
+                continue
+            try:
+                yield db
+            finally:
+                await db.close()
+            return
+    yield primary
+
+# Selected by DB_ASYNC
+get_db = get_async_db if DB_ASYNC else get_sync_db
+get_read_db = get_async_read_db if DB_ASYNC else get_sync_read_db
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from typing import Callable, Iterable, Iterator
+from sqlalchemy.orm import Session
+from database import SessionLocal
+
+
+# Streaming exports
+# =============================================================
+# Rows are buffered into chunks of roughly this size before being sent
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _ndjson_chunks(rows: Iterable[dict]) -> Iterator[str]:
+    rows = iter(rows)
+    # Send the first row straight away so the first byte is not held back
+    for row in rows:
+        yield json.dumps(dict(row), default=str) + "\n"
+        break
+    buffer = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(row), default=str) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+def _csv_chunks(rows: Iterable[dict], columns: list[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    # Send the header straight away so the first byte is not held back
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_export(fetch_rows: Callable[[Session], Iterable[dict]], fmt: str, columns: list[str]) -> Iterator[str]:
+    # The export owns its session: it has to outlive the request handler
+    db = SessionLocal()
+    try:
+        rows = fetch_rows(db)
+        if fmt == "csv":
+            yield from _csv_chunks(rows, columns)
+        else:
+            yield from _ndjson_chunks(rows)
+    finally:
+        db.close()
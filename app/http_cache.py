@@ -0,0 +1,32 @@
+import base64
+import hashlib
+from datetime import datetime
+from typing import Iterable
+from fastapi import HTTPException, Request
+
+
+# Conditional GET helpers (ETag)
+# =============================================================
+# No Last-Modified: a timestamp cannot reflect rows leaving a result, so
+# If-Modified-Since would answer 304 after deletions.
+def make_etag(*parts: Iterable) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+
+# Opaque keyset cursors for (due_date, id) ordered feeds
+def encode_cursor(due_date: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{due_date.isoformat()}|{row_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        due_date, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(due_date), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
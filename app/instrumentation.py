@@ -0,0 +1,167 @@
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Per-request timing and SQL instrumentation
+# =============================================================
+# METRICS_ENABLED turns on the request middleware and SQL hooks; when it is
+# off nothing is registered, so requests pay nothing. SLOW_QUERY_MS > 0 logs
+# statements slower than the threshold (works with metrics on or off).
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 0))
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+slow_query_logger = logging.getLogger("slow_query")
+
+class RequestStats:
+    __slots__ = ("sql_count", "sql_time", "auth_time")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.auth_time = 0.0
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}          # (method, route, status) -> count
+        self.latency = {}           # (method, route) -> [bucket counts..., sum, count]
+        self.route_sql_count = {}   # (method, route) -> statements
+        self.route_sql_time = {}    # (method, route) -> seconds
+        self.route_auth_time = {}   # (method, route) -> seconds
+        self.sql_count = 0
+        self.sql_time = 0.0
+
+    def observe_request(self, method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+            histogram = self.latency.setdefault(key, [0] * (len(LATENCY_BUCKETS) + 2))
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    histogram[i] += 1
+            histogram[-2] += duration
+            histogram[-1] += 1
+            self.route_sql_count[key] = self.route_sql_count.get(key, 0) + stats.sql_count
+            self.route_sql_time[key] = self.route_sql_time.get(key, 0.0) + stats.sql_time
+            self.route_auth_time[key] = self.route_auth_time.get(key, 0.0) + stats.auth_time
+
+    def observe_sql(self, duration: float) -> None:
+        with self._lock:
+            self.sql_count += 1
+            self.sql_time += duration
+
+    # Prometheus text exposition format
+    def render(self) -> str:
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(method, route, **extra):
+            pairs = {"method": method, "route": route, **extra}
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs.items()) + "}"
+
+        with self._lock:
+            header("http_requests_total", "counter", "HTTP requests by route template and status")
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{labels(method, route, status=status)} {count}")
+
+            header("http_request_duration_seconds", "histogram", "Total request latency")
+            for (method, route), histogram in sorted(self.latency.items()):
+                for bound, count in zip(LATENCY_BUCKETS, histogram):
+                    lines.append(f"http_request_duration_seconds_bucket{labels(method, route, le=bound)} {count}")
+                lines.append(f"http_request_duration_seconds_bucket{labels(method, route, le='+Inf')} {histogram[-1]}")
+                lines.append(f"http_request_duration_seconds_sum{labels(method, route)} {histogram[-2]}")
+                lines.append(f"http_request_duration_seconds_count{labels(method, route)} {histogram[-1]}")
+
+            header("http_request_sql_statements_total", "counter", "SQL statements executed while serving the route")
+            for (method, route), count in sorted(self.route_sql_count.items()):
+                lines.append(f"http_request_sql_statements_total{labels(method, route)} {count}")
+
+            header("http_request_sql_duration_seconds_total", "counter", "Time spent in SQL while serving the route")
+            for (method, route), seconds in sorted(self.route_sql_time.items()):
+                lines.append(f"http_request_sql_duration_seconds_total{labels(method, route)} {seconds}")
+
+            header("http_request_auth_duration_seconds_total", "counter", "Time spent in get_current_user while serving the route")
+            for (method, route), seconds in sorted(self.route_auth_time.items()):
+                lines.append(f"http_request_auth_duration_seconds_total{labels(method, route)} {seconds}")
+
+            header("db_statements_total", "counter", "SQL statements executed")
+            lines.append(f"db_statements_total {self.sql_count}")
+            header("db_statement_duration_seconds_total", "counter", "Time spent executing SQL statements")
+            lines.append(f"db_statement_duration_seconds_total {self.sql_time}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+
+# ASGI middleware (not BaseHTTPMiddleware, which adds a task per request)
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_request.reset(token)
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            registry.observe_request(scope["method"], template, status_code, time.perf_counter() - started, stats)
+
+
+def record_auth_time(seconds: float) -> None:
+    stats = _current_request.get()
+    if stats is not None:
+        stats.auth_time += seconds
+
+
+# SQL statement hooks
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    if METRICS_ENABLED:
+        registry.observe_sql(duration)
+        stats = _current_request.get()
+        if stats is not None:
+            stats.sql_count += 1
+            stats.sql_time += duration
+    if SLOW_QUERY_MS and duration * 1000 >= SLOW_QUERY_MS:
+        slow_query_logger.warning("Slow query (%.1f ms): %s", duration * 1000, statement)
+
+def attach_engine(engine: Engine) -> None:
+    if not (METRICS_ENABLED or SLOW_QUERY_MS):
+        return
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,39 @@
+import logging
+from database import SessionLocal
+import crud
+from cache import course_cache
+from jobs import job_queue
+
+
+# Post-commit event handlers
+# =============================================================
+# Run on the job queue workers, never on the request path.
+notification_logger = logging.getLogger("notifications")
+
+# Warm the course cache so the next lookup after a write is a hit
+@job_queue.on("course.created")
+@job_queue.on("course.updated")
+def warm_course_cache(payload: dict) -> None:
+    db = SessionLocal()
+    try:
+        course_cache.invalidate(payload["course_id"])
+        crud.get_course_by_id(db, payload["course_id"])
+    finally:
+        db.close()
+
+# Notification hooks: delivery (e-mail, push) plugs in here
+@job_queue.on("user.created")
+def notify_user_created(payload: dict) -> None:
+    notification_logger.info("Welcome notification for user %s", payload["user_id"])
+
+@job_queue.on("enrollment.created")
+def notify_enrollment_created(payload: dict) -> None:
+    notification_logger.info("Enrollment notification for user %s in course %s", payload["user_id"], payload["course_id"])
+
+@job_queue.on("enrollment.bulk_created")
+def notify_bulk_enrollment(payload: dict) -> None:
+    notification_logger.info("Enrollment notification for %d users in course %s", len(payload["user_ids"]), payload["course_id"])
+
+@job_queue.on("assignment.created")
+def notify_assignment_created(payload: dict) -> None:
+    notification_logger.info("New assignment %s in course %s due %s", payload["assignment_id"], payload["course_id"], payload["due_date"])
@@ -0,0 +1,328 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+# Background jobs for post-commit side effects
+# =============================================================
+# crud functions publish events after they commit; every handler registered
+# for the event becomes its own job, run by a worker thread off the request
+# path and retried with exponential backoff. Events without handlers cost a
+# dict lookup. JOBS_BACKEND=sqlite keeps pending jobs in a SQLite table so
+# they survive restarts.
+JOBS_BACKEND = os.environ.get('JOBS_BACKEND', 'memory')
+JOBS_SQLITE_PATH = os.environ.get('JOBS_SQLITE_PATH', 'jobs.db')
+JOBS_MAX_QUEUE = int(os.environ.get('JOBS_MAX_QUEUE', 10000))
+JOBS_WORKERS = int(os.environ.get('JOBS_WORKERS', 2))
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 5))
+JOBS_RETRY_BASE_SECONDS = float(os.environ.get('JOBS_RETRY_BASE_SECONDS', 0.5))
+JOBS_RETRY_MAX_SECONDS = float(os.environ.get('JOBS_RETRY_MAX_SECONDS', 60))
+# A claimed SQLite job not finished within the lease is assumed lost with its
+# worker and claimed again, so handlers must finish well within it
+JOBS_LEASE_SECONDS = float(os.environ.get('JOBS_LEASE_SECONDS', 300))
+
+logger = logging.getLogger("jobs")
+
+@dataclass
+class Job:
+    handler: str
+    event: str
+    payload: dict
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+    run_at: float = field(default_factory=time.time)
+    id: Optional[int] = None
+
+
+# In-memory store: a heap ordered by run_at
+class MemoryJobStore:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def put(self, job: Job, force: bool = False) -> bool:
+        with self._cond:
+            if not force and len(self._heap) >= self.maxsize:
+                return False
+            heapq.heappush(self._heap, (job.run_at, next(self._counter), job))
+            self._cond.notify()
+            return True
+
+    def get(self, timeout: float) -> Optional[Job]:
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)[2]
+                if now >= deadline:
+                    return None
+                wait = deadline - now
+                if self._heap:
+                    wait = min(wait, self._heap[0][0] - now)
+                self._cond.wait(wait)
+
+    def ack(self, job: Job) -> None:
+        pass
+
+    def retry(self, job: Job) -> None:
+        self.put(job, force=True)
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def oldest_enqueued_at(self) -> Optional[float]:
+        with self._cond:
+            return min((entry[2].enqueued_at for entry in self._heap), default=None)
+
+    def wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+
+# Durable store: one row per pending job; claimed rows are marked locked.
+# Several processes can share the file.
+class SQLiteJobStore:
+    POLL_SECONDS = 0.2
+    DEPTH_REFRESH_SECONDS = 1.0
+
+    def __init__(self, path: str, maxsize: int, lease: float):
+        self.maxsize = maxsize
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                handler TEXT NOT NULL,
+                event TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                enqueued_at REAL NOT NULL,
+                run_at REAL NOT NULL,
+                locked_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_job_queue_run_at ON job_queue (locked_at, run_at)")
+        # Approximate depth for the maxsize check, so publishing (on the
+        # request thread) never counts the table. Workers refresh it.
+        self._depth = self.depth()
+        self._depth_refreshed_at = time.monotonic()
+
+    def put(self, job: Job, force: bool = False) -> bool:
+        with self._lock:
+            if not force and self._depth >= self.maxsize:
+                return False
+            self._conn.execute(
+                "INSERT INTO job_queue (handler, event, payload, attempts, enqueued_at, run_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job.handler, job.event, json.dumps(job.payload, default=str), job.attempts, job.enqueued_at, job.run_at),
+            )
+            self._depth += 1
+        self._wakeup.set()
+        return True
+
+    def _refresh_depth(self) -> None:
+        if time.monotonic() - self._depth_refreshed_at < self.DEPTH_REFRESH_SECONDS:
+            return
+        depth = self.depth()
+        with self._lock:
+            self._depth = depth
+            self._depth_refreshed_at = time.monotonic()
+
+    # Unclaimed jobs, or jobs whose claim outlived the lease because the
+    # process holding it died
+    def _claim(self) -> Optional[Job]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT id, handler, event, payload, attempts, enqueued_at, run_at FROM job_queue "
+                    "WHERE (locked_at IS NULL OR locked_at < ?) AND run_at <= ? ORDER BY run_at LIMIT 1",
+                    (now - self.lease, now),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE job_queue SET locked_at = ? WHERE id = ?", (now, row[0]))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job_id, handler, event, payload, attempts, enqueued_at, run_at = row
+        return Job(handler=handler, event=event, payload=json.loads(payload), attempts=attempts,
+                   enqueued_at=enqueued_at, run_at=run_at, id=job_id)
+
+    def get(self, timeout: float) -> Optional[Job]:
+        deadline = time.time() + timeout
+        while True:
+            self._refresh_depth()
+            job = self._claim()
+            if job is not None or time.time() >= deadline:
+                return job
+            self._wakeup.wait(min(self.POLL_SECONDS, max(0.0, deadline - time.time())))
+            self._wakeup.clear()
+
+    def ack(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM job_queue WHERE id = ?", (job.id,))
+            self._depth = max(0, self._depth - 1)
+
+    def retry(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_queue SET attempts = ?, run_at = ?, locked_at = NULL WHERE id = ?",
+                (job.attempts, job.run_at, job.id),
+            )
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM job_queue").fetchone()[0]
+
+    def oldest_enqueued_at(self) -> Optional[float]:
+        with self._lock:
+            return self._conn.execute("SELECT MIN(enqueued_at) FROM job_queue").fetchone()[0]
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+
+# The store is built on first use (start or publish), not at import
+class JobQueue:
+    def __init__(self, store_factory: Callable[[], object], workers: int, max_attempts: int, retry_base: float, retry_max: float):
+        self.store_factory = store_factory
+        self.store = None
+        self._store_lock = threading.Lock()
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.handlers: dict[str, list[tuple[str, Callable[[dict], None]]]] = {}
+        self._registry: dict[str, Callable[[dict], None]] = {}
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.dropped = 0
+
+    # Decorator registering a handler for an event
+    def on(self, event: str):
+        def register(fn: Callable[[dict], None]):
+            name = f"{fn.__module__}.{fn.__qualname__}"
+            self.handlers.setdefault(event, []).append((name, fn))
+            self._registry[name] = fn
+            return fn
+        return register
+
+    def _get_store(self):
+        if self.store is None:
+            with self._store_lock:
+                if self.store is None:
+                    self.store = self.store_factory()
+        return self.store
+
+    def publish(self, event: str, payload: dict) -> None:
+        for name, _ in self.handlers.get(event, ()):
+            if not self._get_store().put(Job(handler=name, event=event, payload=payload)):
+                with self._stats_lock:
+                    self.dropped += 1
+                logger.warning("Job queue full, dropped %s for %s", name, event)
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._get_store()
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self.store is not None:
+            self.store.wake()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            job = self.store.get(timeout=1.0)
+            if job is not None:
+                self._run(job)
+
+    def _run(self, job: Job) -> None:
+        handler = self._registry.get(job.handler)
+        with self._stats_lock:
+            self.in_flight += 1
+        try:
+            if handler is None:
+                raise LookupError(f"No handler named {job.handler}")
+            handler(job.payload)
+        except Exception:
+            job.attempts += 1
+            if job.attempts >= self.max_attempts:
+                logger.exception("Job %s for %s failed after %d attempts", job.handler, job.event, job.attempts)
+                self.store.ack(job)
+                with self._stats_lock:
+                    self.failed += 1
+            else:
+                job.run_at = time.time() + min(self.retry_max, self.retry_base * 2 ** (job.attempts - 1))
+                self.store.retry(job)
+                with self._stats_lock:
+                    self.retried += 1
+        else:
+            self.store.ack(job)
+            with self._stats_lock:
+                self.processed += 1
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        store = self._get_store()
+        oldest = store.oldest_enqueued_at()
+        with self._stats_lock:
+            return {
+                "backend": type(store).__name__,
+                "workers": len(self._threads),
+                "depth": store.depth(),
+                "lag_seconds": time.time() - oldest if oldest is not None else 0.0,
+                "in_flight": self.in_flight,
+                "processed": self.processed,
+                "retried": self.retried,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            }
+
+
+def make_store():
+    if JOBS_BACKEND == "sqlite":
+        return SQLiteJobStore(JOBS_SQLITE_PATH, maxsize=JOBS_MAX_QUEUE, lease=JOBS_LEASE_SECONDS)
+    if JOBS_BACKEND == "memory":
+        return MemoryJobStore(maxsize=JOBS_MAX_QUEUE)
+    raise ValueError(f"Unknown jobs backend: {JOBS_BACKEND}")
+
+job_queue = JobQueue(
+    make_store,
+    workers=JOBS_WORKERS,
+    max_attempts=JOBS_MAX_ATTEMPTS,
+    retry_base=JOBS_RETRY_BASE_SECONDS,
+    retry_max=JOBS_RETRY_MAX_SECONDS,
+)
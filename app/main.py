@@ -1,56 +1,152 @@
-from fastapi import Depends, FastAPI, HTTPException, status
+import functools
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import EmailStr
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from database import Base, SessionLocal, engine
-import schemas, crud, model
-from dependencies import get_db
-from auth import pwd_context, oauth2_scheme, authenticate_user, create_access_token, get_current_user 
+import database
+import schemas, crud, crud_async, model, migrations, instrumentation, serialization, job_handlers, ratelimit
+from dependencies import get_db, get_read_db
+from auth import oauth2_scheme, authenticate_user_async, create_access_token, get_current_user, hash_password_async, password_pool, token_data
+from cache import course_cache, user_cache
+from jobs import job_queue
+from pool_stats import pool_snapshot
+from exports import MEDIA_TYPES, stream_export
+from storage import MAX_SUBMISSION_BYTES, InvalidUpload, SubmissionTooLarge, blob_path, save_upload
+from http_cache import decode_cursor, encode_cursor, is_not_modified, make_etag
 
 
-Base.metadata.create_all(bind=engine)
+# Schema changes are a deploy step: run `python migrations.py` once before
+# starting workers. RUN_MIGRATIONS_ON_STARTUP=true migrates on every worker
+# start instead, which is handy in development.
+RUN_MIGRATIONS_ON_STARTUP = os.environ.get('RUN_MIGRATIONS_ON_STARTUP', 'false').lower() in ('1', 'true', 'yes')
 
-app = FastAPI()
+# Nothing connects to the database at import; engines, migrations and the
+# background job workers live for the lifetime of the app
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    engine = database.init_engines()
+    for instrumented in [engine, *database.replica_engines]:
+        instrumentation.attach_engine(instrumented)
+    if database.async_engine is not None:
+        for instrumented in [database.async_engine, *database.async_replica_engines]:
+            instrumentation.attach_engine(instrumented.sync_engine)
+    if RUN_MIGRATIONS_ON_STARTUP:
+        migrations.upgrade(engine)
+    job_queue.start()
+    try:
+        yield
+    finally:
+        job_queue.stop()
+        await database.dispose_engines()
+
+app = FastAPI(lifespan=lifespan)
+
+if instrumentation.METRICS_ENABLED:
+    app.add_middleware(instrumentation.MetricsMiddleware)
 
 @app.get("/")
 async def home():
     return {"message": "Welcome To The Assignment Submission System"}
 
+# Per-route request, SQL and auth timings in Prometheus text format
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    if not instrumentation.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(instrumentation.registry.render(), media_type="text/plain; version=0.0.4")
+
+# Authenticated user cache hit/miss counters
+@app.get("/metrics/user-cache")
+async def user_cache_stats():
+    return user_cache.stats()
+
+# Course lookup cache hit ratio
+@app.get("/metrics/course-cache")
+async def course_cache_stats():
+    return course_cache.stats()
+
+# Password hashing worker pool queueing metrics
+@app.get("/metrics/password-pool")
+async def password_pool_stats():
+    return password_pool.stats()
+
+# Login/signup rate limit and bcrypt admission control counters
+@app.get("/metrics/rate-limit")
+async def rate_limit_stats():
+    return ratelimit.stats()
+
+# Background job queue depth, lag and outcomes
+@app.get("/metrics/jobs")
+async def job_queue_stats():
+    return job_queue.stats()
+
+# Database connection pool state and checkout wait histogram
+@app.get("/metrics/db-pool")
+async def db_pool_stats():
+    stats = {"sync": pool_snapshot(database.engine.pool)}
+    if database.replica_engines:
+        stats["replicas"] = _replica_pool_snapshots(database.replica_engines)
+    if database.async_engine is not None:
+        stats["async"] = pool_snapshot(database.async_engine.sync_engine.pool)
+        if database.async_replica_engines:
+            stats["async_replicas"] = _replica_pool_snapshots(
+                [replica.sync_engine for replica in database.async_replica_engines]
+            )
+    return stats
+
+def _replica_pool_snapshots(engines: list) -> dict:
+    return {engine.url.render_as_string(hide_password=True): pool_snapshot(engine.pool) for engine in engines}
+
 # User management endpoints
 #register a new user
 @app.post("/users/signup/", response_model=schemas.UserResponse)
-async def signUp(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    check_email = crud.check_email(db, email = user.email)
-    if check_email:
+async def signUp(request: Request, user: schemas.UserCreate, db: Session = Depends(get_db)):
+    # Admin (registrar) accounts are provisioned server-side, never self-registered
+    if user.role == schemas.UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin accounts cannot be self-registered")
+    await ratelimit.guard_signup(request, user.username)
+    email_taken, username_taken = await crud_async.find_signup_conflicts(db, email=user.email, username=user.username)
+    if email_taken:
         raise HTTPException(status_code=400, detail="Email Has been used")
-    check_username = crud.check_username(db, username=user.username)
-    if check_username:
+    if username_taken:
         raise HTTPException(status_code=400, detail="Username Taken")
-    hashed_password = pwd_context.hash(user.password)
-    new_user = crud.Sign_up(db=db, user=user, hashed_password = hashed_password)
+    hashed_password = await hash_password_async(user.password)
+    new_user = await crud_async.Sign_up(db=db, user=user, hashed_password = hashed_password)
     return new_user
               
 # User Login
 @app.post("/users/login/")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    await ratelimit.guard_login(request, form_data.username)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=401,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data=token_data(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
+# Revoke every token issued to the current user
+@app.post("/users/me/revoke-tokens")
+async def revoke_tokens(db: Session = Depends(get_db), current_user: schemas.User = Depends(get_current_user)):
+    await crud_async.revoke_tokens(db=db, user_id=current_user.user_id)
+    return {"message": "All tokens revoked"}
+
 #Edit User
 @app.put("/users/me", response_model=schemas.UserResponse)
 async def update_user_profile(updateUser: schemas.UserUpdate,db: Session = Depends(get_db),current_user: schemas.User = Depends(get_current_user)):
-    user = crud.check_username(db, username=current_user.username)
+    user = await crud_async.check_username(db, username=current_user.username)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not Authorized")
 
-    updated_user = crud.UpdateUser(db=db, email=current_user.email, updateUser=updateUser)
+    updated_user = await crud_async.UpdateUser(db=db, email=user.email, updateUser=updateUser)
     return updated_user
 
 # Course Management endpoints
@@ -61,27 +157,64 @@ async def create_course(course: schemas.RegisterCourse, db: Session = Depends(ge
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only lecturers can create courses")
     # Get the lecturer ID from the current user
     lecturer_id = current_user.user_id
-    new_course = crud.create_new_course(db=db, course=course, lecturer_id=lecturer_id)
+    new_course = await crud_async.create_new_course(db=db, course=course, lecturer_id=lecturer_id)
     return new_course
 
-# Get all courses
-@app.get("/courses/", response_model=list[schemas.CourseResponse])
-async def get_all_courses(db: Session = Depends(get_db)):
-    courses = crud.get_all_courses(db=db)
-    return courses
+# Get all courses, one page at a time
+# Pass the returned next_cursor back as `cursor` to fetch the following page
+@app.get("/courses/", response_model=schemas.CoursePage)
+async def get_all_courses(
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    lecturer_id: Optional[int] = None,
+    code_prefix: Optional[str] = Query(None, min_length=1),
+    db: Session = Depends(get_read_db),
+):
+    if serialization.FAST_SERIALIZATION:
+        rows, next_cursor = await crud_async.get_course_rows_page(
+            db=db, limit=limit, after_id=cursor, lecturer_id=lecturer_id, code_prefix=code_prefix
+        )
+        items = [
+            {"course_name": row.course_name, "course_code": row.course_code, "description": row.description}
+            for row in rows
+        ]
+        return serialization.FastJSONResponse({"items": items, "next_cursor": next_cursor})
+    courses, next_cursor = await crud_async.get_courses_page(
+        db=db, limit=limit, after_id=cursor, lecturer_id=lecturer_id, code_prefix=code_prefix
+    )
+    return {"items": courses, "next_cursor": next_cursor}
+
+# Ranked keyword search over course name, code and description.
+# Declared before /courses/{course_id} so "search" is not read as an id.
+# offset stops at crud.SEARCH_MAX_OFFSET; the last page has no next_offset.
+@app.get("/courses/search", response_model=schemas.CourseSearchPage)
+async def search_courses(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=crud.SEARCH_MAX_OFFSET),
+    db: Session = Depends(get_read_db),
+):
+    rows, next_offset = await crud_async.search_courses(db=db, q=q, limit=limit, offset=offset)
+    items = [
+        {"course_name": row.course_name, "course_code": row.course_code, "description": row.description}
+        for row in rows
+    ]
+    if serialization.FAST_SERIALIZATION:
+        return serialization.FastJSONResponse({"items": items, "next_offset": next_offset})
+    return {"items": items, "next_offset": next_offset}
 
 # Get course by ID
 @app.get("/courses/{course_id}", response_model=schemas.CourseResponse)
-async def get_course_by_id(course_id: int, db: Session = Depends(get_db)):
-    course = crud.get_course_by_id(db=db, course_id=course_id)
+async def get_course_by_id(course_id: int, db: Session = Depends(get_read_db)):
+    course = await crud_async.get_course_by_id(db=db, course_id=course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course
 
 # Get course by course code
 @app.get("/courses/code/{course_code}", response_model=schemas.CourseResponse)
-async def get_course_by_code(course_code: str, db: Session = Depends(get_db)):
-    course = crud.get_course_by_code(db=db, course_code=course_code)
+async def get_course_by_code(course_code: str, db: Session = Depends(get_read_db)):
+    course = await crud_async.get_course_by_code(db=db, course_code=course_code)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course
@@ -92,13 +225,13 @@ async def update_course(course_id: int, course_update: schemas.CourseUpdate, db:
     if current_user.role != "lecturer":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only lecturers can update courses")
     # Check if the user is the lecturer of the course
-    course = crud.get_course_by_id(db=db, course_id=course_id)
+    course = await crud_async.get_course_by_id(db=db, course_id=course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found") 
     if course.lecturer_id != current_user.user_id:
         raise HTTPException(status_code=403, detail="You are not authorized to update this course")
     # Update the course
-    updated_course = crud.update_course(db=db, course_id=course_id, course_update=course_update)
+    updated_course = await crud_async.update_course(db=db, course_id=course_id, course_update=course_update)
     return updated_course
 
 # Update course by course code
@@ -107,13 +240,13 @@ async def update_course_by_code(course_code: str, course_update: schemas.CourseU
     if current_user.role != "lecturer":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only lecturers can update courses")
     # Check if the user is the lecturer of the course
-    course = crud.get_course_by_code(db=db, course_code=course_code)
+    course = await crud_async.get_course_by_code(db=db, course_code=course_code)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     if course.lecturer_id != current_user.user_id:
         raise HTTPException(status_code=403, detail="You are not authorized to update this course")
     # Update the course
-    updated_course = crud.update_course_by_code(db=db, course_code=course_code, course_update=course_update)
+    updated_course = await crud_async.update_course_by_code(db=db, course_code=course_code, course_update=course_update)
     return updated_course
 
 
@@ -122,64 +255,105 @@ async def update_course_by_code(course_code: str, course_update: schemas.CourseU
 async def enroll_in_course(course_id: int, db: Session = Depends(get_db), current_user: schemas.User = Depends(get_current_user)):
     user_id = current_user.user_id
     # Get Course name by course_id
-    course = crud.get_course_by_id(db=db, course_id=course_id)
+    course = await crud_async.get_course_by_id(db=db, course_id=course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    # Check if the user is already enrolled in the course
-    existing_enrollment = db.query(model.Enrollment).filter(
-        model.Enrollment.user_id == user_id,
-        model.Enrollment.course_id == course_id
-    ).first()
-    if existing_enrollment:
+    # Create the enrollment; the unique (user_id, course_id) index rejects duplicates
+    enrolled = await crud_async.new_enroll(db=db, user_id=user_id, course_id=course_id)
+    if not enrolled:
         raise HTTPException(status_code=400, detail="Already enrolled in this course")
-    # Create a new enrollment
-    enrollment = crud.new_enroll(db=db, user_id=user_id, course_id=course_id)
-    if not enrollment:
-        raise HTTPException(status_code=404, detail="Course not found or already enrolled")
     return schemas.EnrollResponse(
         username=current_user.username,          
         course_name=course.course_name,
         course_code=course.course_code,
         lecturer_id=course.lecturer_id
     )
+# Enroll a whole cohort in a course (course lecturer only)
+@app.post("/courses/{course_id}/enroll/bulk", response_model=schemas.BulkEnrollResponse)
+async def bulk_enroll_in_course(course_id: int, cohort: schemas.BulkEnrollRequest, db: Session = Depends(get_db), current_user: schemas.User = Depends(get_current_user)):
+    if current_user.role != "lecturer":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only lecturers can bulk enroll students")
+    course = await crud_async.get_course_by_id(db=db, course_id=course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if course.lecturer_id != current_user.user_id:
+        raise HTTPException(status_code=403, detail="You are not authorized to enroll students in this course")
+    outcomes = await crud_async.bulk_enroll(db=db, course_id=course_id, user_ids=cohort.user_ids, usernames=cohort.usernames)
+    results = [schemas.BulkEnrollResult(user_id=user_id, username=username, status=outcome) for user_id, username, outcome in outcomes]
+    return schemas.BulkEnrollResponse(
+        course_code=course.course_code,
+        enrolled=sum(result.status == "enrolled" for result in results),
+        already_enrolled=sum(result.status == "already_enrolled" for result in results),
+        not_found=sum(result.status == "not_found" for result in results),
+        results=results,
+    )
+
 # Get all enrollments for a user
 @app.get("/users/me/enrollments", response_model=list[schemas.EnrollResponse])
-async def get_user_enrollments(db: Session = Depends(get_db), current_user: schemas.User = Depends(get_current_user)):
-    user_id = current_user.user_id
-    enrollments = crud.get_enrollments_by_user_id(db=db, user_id=current_user.user_id)
+async def get_user_enrollments(db: Session = Depends(get_read_db), current_user: schemas.User = Depends(get_current_user)):
+    if serialization.FAST_SERIALIZATION:
+        rows = await crud_async.get_enrollment_rows(db=db, user_id=current_user.user_id)
+        if not rows:
+            raise HTTPException(status_code=404, detail="No enrollments found")
+        username = current_user.username
+        return serialization.FastJSONResponse([
+            {"username": username, "course_name": row.course_name, "course_code": row.course_code, "lecturer_id": row.lecturer_id}
+            for row in rows
+        ])
+    enrollments = await crud_async.get_enrollments_with_courses(db=db, user_id=current_user.user_id)
     if not enrollments:
         raise HTTPException(status_code=404, detail="No enrollments found")
     
     response = []
     for enrollment in enrollments:
-        course = crud.get_course_by_id(db=db, course_id=enrollment.course_id)
-        if course:
-            response.append(schemas.EnrollResponse(
-                username=current_user.username,
-                course_name=course.course_name,
-                course_code=course.course_code,
-                lecturer_id=course.lecturer_id
-            ))
+        course = enrollment.course
+        response.append(schemas.EnrollResponse(
+            username=current_user.username,
+            course_name=course.course_name,
+            course_code=course.course_code,
+            lecturer_id=course.lecturer_id
+        ))
     return response
 
+# Upcoming deadlines across all of the current user's courses
+# Supports conditional GET: send back ETag as If-None-Match to get a 304
+# when nothing changed. The ETag comes from a cheap aggregate, so a 304
+# never runs the feed query.
+@app.get("/users/me/deadlines", response_model=schemas.DeadlinePage)
+async def get_upcoming_deadlines(
+    request: Request,
+    response: Response,
+    days: int = Query(7, ge=1, le=90),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    after = decode_cursor(cursor) if cursor else None
+    start = datetime.now(timezone.utc).replace(tzinfo=None)
+    end = start + timedelta(days=days)
+    version = await crud_async.get_deadlines_version(db=db, user_id=current_user.user_id, start=start, end=end)
+    headers = {"ETag": make_etag(days, cursor, limit, version), "Cache-Control": "private, no-cache"}
+    if is_not_modified(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    rows, last_key = await crud_async.get_upcoming_deadlines(
+        db=db, user_id=current_user.user_id, start=start, end=end, limit=limit, after=after
+    )
+    items = [schemas.DeadlineItem.model_validate(dict(row)) for row in rows]
+    next_cursor = encode_cursor(*last_key) if last_key else None
+    response.headers.update(headers)
+    return schemas.DeadlinePage(items=items, next_cursor=next_cursor)
+
 # Unenroll from a course
 @app.delete("/courses/{course_id}/unenroll", response_model=schemas.EnrollResponse)
 async def unenroll_from_course(course_id: int, db: Session = Depends(get_db), current_user: schemas.User = Depends(get_current_user)):
     user_id = current_user.user_id
-    # Check if the user is enrolled in the course
-    enrollment = db.query(model.Enrollment).filter(
-        model.Enrollment.user_id == user_id,
-        model.Enrollment.course_id == course_id
-    ).first()
-    if not enrollment:
-        raise HTTPException(status_code=404, detail="Enrollment not found")
-    
-    # Unenroll the user from the course
-    db.delete(enrollment)
-    db.commit()
+    # Unenroll the user from the course (404 if not enrolled)
+    await crud_async.unenroll_from_course(db=db, user_id=user_id, course_id=course_id)
     
     # Get Course name by course_id
-    course = crud.get_course_by_id(db=db, course_id=course_id)
+    course = await crud_async.get_course_by_id(db=db, course_id=course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
@@ -190,6 +364,14 @@ async def unenroll_from_course(course_id: int, db: Session = Depends(get_db), cu
         lecturer_id=course.lecturer_id
     )
 
+# Lecturer dashboard: enrollment count, assignment count and next due date per course
+@app.get("/lecturers/me/dashboard", response_model=list[schemas.DashboardCourse])
+async def lecturer_dashboard(db: Session = Depends(get_db), current_user: schemas.User = Depends(get_current_user)):
+    if current_user.role != "lecturer":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only lecturers have a dashboard")
+    rows = await crud_async.get_lecturer_dashboard(db=db, lecturer_id=current_user.user_id)
+    return [dict(row) for row in rows]
+
 # Assignment Management endpoints
 # Create a new assignment
 @app.post("/assignments/", response_model=schemas.AssignmentResponse)
@@ -198,13 +380,94 @@ async def create_assignment(assignment: schemas.AssignmentCreate, db: Session =
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only lecturers can create assignments")
 
     # Create the assignment
-    new_assignment = crud.create_assignment(db=db, assignment=assignment, lecturer_id=current_user.user_id)
+    new_assignment = await crud_async.create_assignment(db=db, assignment=assignment, lecturer_id=current_user.user_id)
     return new_assignment
 
 # Get assignemt by ID
 @app.get("/assignments/{assignment_id}", response_model=schemas.AssignmentResponse)
-async def get_assignment_by_id(assignment_id: int, db: Session = Depends(get_db)):
-    assignment = crud.get_assignment_by_id(db=db, assignment_id=assignment_id)
+async def get_assignment_by_id(assignment_id: int, db: Session = Depends(get_read_db)):
+    assignment = await crud_async.get_assignment_by_id(db=db, assignment_id=assignment_id)
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
-    return 
+    return assignment
+
+# Submission endpoints
+# Submit (or resubmit) a file for an assignment
+# The multipart body is parsed as it arrives (see storage.save_upload), so
+# it is declared for the docs instead of as an UploadFile parameter.
+@app.post(
+    "/assignments/{assignment_id}/submissions",
+    response_model=schemas.SubmissionResponse,
+    openapi_extra={"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "properties": {"file": {"type": "string", "format": "binary"}},
+        "required": ["file"],
+    }}}}},
+)
+async def submit_assignment(assignment_id: int, request: Request, db: Session = Depends(get_db), current_user: schemas.User = Depends(get_current_user)):
+    assignment = await crud_async.get_assignment_by_id(db=db, assignment_id=assignment_id)
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    enrolled = await crud_async.enrollment_exists(db=db, user_id=current_user.user_id, course_id=assignment.course_id)
+    if not enrolled:
+        raise HTTPException(status_code=403, detail="You are not enrolled in this course")
+    try:
+        file_sha256, size, filename, content_type = await save_upload(request)
+    except SubmissionTooLarge:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_SUBMISSION_BYTES} byte limit")
+    except InvalidUpload as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    submission = await crud_async.save_submission(
+        db=db,
+        assignment_id=assignment_id,
+        user_id=current_user.user_id,
+        file_sha256=file_sha256,
+        filename=filename or "submission",
+        content_type=content_type or "application/octet-stream",
+        size=size,
+    )
+    return submission
+
+# Download a submission (the student who submitted it or the assignment's lecturer)
+# FileResponse streams from disk, supports Range requests and uses the
+# server's zero-copy send when available.
+@app.get("/submissions/{submission_id}/download")
+async def download_submission(submission_id: int, db: Session = Depends(get_db), current_user: schemas.User = Depends(get_current_user)):
+    submission = await crud_async.get_submission_by_id(db=db, submission_id=submission_id)
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    if current_user.user_id not in (submission.user_id, submission.assignment.lecturer_id):
+        raise HTTPException(status_code=403, detail="You are not authorized to download this submission")
+    return FileResponse(
+        blob_path(submission.file_sha256),
+        media_type=submission.content_type,
+        filename=submission.filename,
+    )
+
+# Export endpoints (registrar)
+# Stream every course as NDJSON or CSV
+@app.get("/exports/courses")
+async def export_courses(format: str = Query("ndjson", pattern="^(ndjson|csv)$"), current_user: schemas.User = Depends(get_current_user)):
+    if current_user.role not in ("lecturer", "admin"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only lecturers and admins can export data")
+    return StreamingResponse(
+        stream_export(crud.stream_courses, format, crud.COURSE_EXPORT_COLUMNS),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=courses.{format}"},
+    )
+
+# Stream enrollments with their user and course as NDJSON or CSV: every
+# enrollment for admins, only their own courses' for lecturers
+@app.get("/exports/enrollments")
+async def export_enrollments(format: str = Query("ndjson", pattern="^(ndjson|csv)$"), current_user: schemas.User = Depends(get_current_user)):
+    if current_user.role == "admin":
+        fetch_rows = crud.stream_enrollments
+    elif current_user.role == "lecturer":
+        fetch_rows = functools.partial(crud.stream_enrollments, lecturer_id=current_user.user_id)
+    else:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only lecturers and admins can export data")
+    return StreamingResponse(
+        stream_export(fetch_rows, format, crud.ENROLLMENT_EXPORT_COLUMNS),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=enrollments.{format}"},
+    )
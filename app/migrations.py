@@ -0,0 +1,174 @@
+from contextlib import contextmanager
+from typing import Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from database import Base, init_engines
+import model
+
+
+# Schema migrations
+# =============================================================
+# Every step is idempotent, so upgrade() can run on each deploy against
+# fresh or existing databases. Run with `python migrations.py` as part of
+# the deploy, before workers start; the app does not migrate on startup
+# unless RUN_MIGRATIONS_ON_STARTUP is set.
+
+# Processes running upgrade() at the same time take turns on this lock
+# (PostgreSQL advisory lock / MySQL named lock), so they do not race each
+# other creating the same tables and indexes
+MIGRATION_LOCK_ID = 7305144
+MIGRATION_LOCK_NAME = "assignment_submission_schema"
+MIGRATION_LOCK_TIMEOUT_SECONDS = 600
+
+# Keep the oldest row of each duplicated (user_id, course_id) pair so the
+# unique index can be built. The derived table keeps MySQL happy.
+DEDUPE_ENROLLMENTS = text("""
+    DELETE FROM enrollments
+    WHERE enrollment_id NOT IN (
+        SELECT keep_id FROM (
+            SELECT MIN(enrollment_id) AS keep_id
+            FROM enrollments
+            GROUP BY user_id, course_id
+        ) AS keep
+    )
+""")
+
+def create_tables(connection) -> None:
+    Base.metadata.create_all(bind=connection)
+
+# create_all skips columns added to tables that already exist
+def add_missing_columns(connection) -> None:
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=connection.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+            connection.execute(text(ddl))
+
+# Only needed until the unique index exists, which then keeps duplicates out
+def dedupe_enrollments(connection) -> None:
+    existing = {index["name"] for index in inspect(connection).get_indexes("enrollments")}
+    if "ux_enrollments_user_id_course_id" in existing:
+        return
+    connection.execute(DEDUPE_ENROLLMENTS)
+
+# create_all skips indexes on tables that already exist
+def create_indexes(connection) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+# Indexes superseded by a wider one, per table
+OBSOLETE_INDEXES = {
+    "assignments": ["ix_assignments_course_id"],
+}
+
+def drop_obsolete_indexes(connection) -> None:
+    inspector = inspect(connection)
+    for table_name, index_names in OBSOLETE_INDEXES.items():
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        for name in index_names:
+            if name not in existing:
+                continue
+            if connection.dialect.name in ("mysql", "mariadb"):
+                connection.execute(text(f"DROP INDEX {name} ON {table_name}"))
+            else:
+                connection.execute(text(f"DROP INDEX {name}"))
+
+# Full-text index for course search (see crud.search_courses), kept in sync
+# by the database itself: triggers on SQLite, a generated column on
+# PostgreSQL, a FULLTEXT index on MySQL.
+SQLITE_COURSE_SEARCH = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5(
+        course_name, course_code, description,
+        content='courses', content_rowid='course_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS courses_fts_ai AFTER INSERT ON courses BEGIN
+        INSERT INTO courses_fts(rowid, course_name, course_code, description)
+        VALUES (new.course_id, new.course_name, new.course_code, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS courses_fts_ad AFTER DELETE ON courses BEGIN
+        INSERT INTO courses_fts(courses_fts, rowid, course_name, course_code, description)
+        VALUES ('delete', old.course_id, old.course_name, old.course_code, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS courses_fts_au AFTER UPDATE ON courses BEGIN
+        INSERT INTO courses_fts(courses_fts, rowid, course_name, course_code, description)
+        VALUES ('delete', old.course_id, old.course_name, old.course_code, old.description);
+        INSERT INTO courses_fts(rowid, course_name, course_code, description)
+        VALUES (new.course_id, new.course_name, new.course_code, new.description);
+    END""",
+]
+
+# Code weighs most, then name, then description
+POSTGRES_COURSE_SEARCH = [
+    """ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(course_code, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(course_name, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_courses_search_vector ON courses USING GIN (search_vector)",
+]
+
+def create_search_index(connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        # Triggers go away with the courses table; the index is rebuilt
+        # whenever they have to be created, which also covers existing rows
+        has_triggers = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'courses_fts_ai'")
+        ).first()
+        if has_triggers:
+            return
+        for statement in SQLITE_COURSE_SEARCH:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO courses_fts(courses_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for statement in POSTGRES_COURSE_SEARCH:
+            connection.execute(text(statement))
+    elif dialect in ("mysql", "mariadb"):
+        existing = {index["name"] for index in inspect(connection).get_indexes("courses")}
+        if "ft_courses_search" not in existing:
+            connection.execute(text("ALTER TABLE courses ADD FULLTEXT INDEX ft_courses_search (course_name, course_code, description)"))
+
+STEPS = [
+    create_tables,
+    add_missing_columns,
+    dedupe_enrollments,
+    create_indexes,
+    drop_obsolete_indexes,
+    create_search_index,
+]
+
+@contextmanager
+def migration_lock(connection):
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        # Released when the upgrade transaction ends
+        connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        yield
+    elif dialect in ("mysql", "mariadb"):
+        connection.execute(text("SELECT GET_LOCK(:name, :timeout)"), {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT_SECONDS})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+    else:
+        yield
+
+def upgrade(bind: Optional[Engine] = None) -> None:
+    bind = bind if bind is not None else init_engines()
+    with bind.begin() as connection, migration_lock(connection):
+        for step in STEPS:
+            step(connection)
+
+
+if __name__ == "__main__":
+    upgrade()
+    print("Database schema is up to date")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Enum, TIMESTAMP, func
+from sqlalchemy import Column, String, Integer, ForeignKey, Enum, TIMESTAMP, Index, func
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -12,11 +12,14 @@ class Users(Base):
     hashed_password = Column(String(255), nullable=False)
     role = Column(String(255),nullable=False)
     email = Column(String(255), unique=True, nullable=False)
+    # Bumped to revoke every token issued to the user
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(TIMESTAMP, server_default=func.now())
 
     courses = relationship("Course", back_populates="lecturer")
     enrollments = relationship("Enrollment", back_populates="user")
     assignments = relationship("Assignment", back_populates="lecturer")
+    submissions = relationship("Submission", back_populates="user")
 
 class Course(Base):
     __tablename__ = 'courses'
@@ -27,11 +30,19 @@ class Course(Base):
     description = Column(String(500), nullable=True)
     lecturer_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    # Bumped on every update; part of the deadline feed's ETag
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
 
     lecturer = relationship("Users", back_populates="courses")
     enrollments = relationship("Enrollment", back_populates="course")
     assignments = relationship("Assignment", back_populates="course")
 
+    # lecturer_id filter + course_id keyset order; course_code prefix uses the unique index.
+    # Also serves as the foreign key index on lecturer_id.
+    __table_args__ = (
+        Index("ix_courses_lecturer_id_course_id", "lecturer_id", "course_id"),
+    )
+
 # Student Enrollment Model
 class Enrollment(Base):
     __tablename__ = 'enrollments'
@@ -44,6 +55,12 @@ class Enrollment(Base):
     user = relationship("Users", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
 
+    # One enrollment per user and course; the unique index also covers user_id lookups
+    __table_args__ = (
+        Index("ux_enrollments_user_id_course_id", "user_id", "course_id", unique=True),
+        Index("ix_enrollments_course_id", "course_id"),
+    )
+
 # Assignment Model
 class Assignment(Base):
     __tablename__ = 'assignments'
@@ -58,4 +75,43 @@ class Assignment(Base):
 
     course = relationship("Course", back_populates="assignments")
     lecturer = relationship("Users", back_populates="assignments")
+    submissions = relationship("Submission", back_populates="assignment")
+
+    # (course_id, due_date) serves both course lookups and due date range scans
+    __table_args__ = (
+        Index("ix_assignments_course_id_due_date", "course_id", "due_date"),
+        Index("ix_assignments_lecturer_id", "lecturer_id"),
+    )
+
+# Assignment Submission Model
+# The file itself lives in content-addressed storage under file_sha256
+class Submission(Base):
+    __tablename__ = 'submissions'
+
+    submission_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    assignment_id = Column(Integer, ForeignKey('assignments.assignment_id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    file_sha256 = Column(String(64), nullable=False)
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(255), nullable=False)
+    size = Column(Integer, nullable=False)
+    submitted_at = Column(TIMESTAMP, server_default=func.now())
+
+    assignment = relationship("Assignment", back_populates="submissions")
+    user = relationship("Users", back_populates="submissions")
+
+    # One current submission per student and assignment
+    __table_args__ = (
+        Index("ux_submissions_assignment_id_user_id", "assignment_id", "user_id", unique=True),
+        Index("ix_submissions_file_sha256", "file_sha256"),
+    )
+
+# Per-course dashboard counters, maintained incrementally (see crud.DASHBOARD_SUMMARY)
+class CourseStats(Base):
+    __tablename__ = 'course_stats'
 
+    course_id = Column(Integer, ForeignKey('courses.course_id'), primary_key=True)
+    enrollment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    assignment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    next_due_date = Column(TIMESTAMP, nullable=True)
+    updated_at = Column(TIMESTAMP, server_default=func.now())
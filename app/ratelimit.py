@@ -0,0 +1,197 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from auth import password_pool
+
+
+# Token-bucket rate limiting
+# =============================================================
+# Each key (client address or username) gets a bucket of `burst` tokens that
+# refills at `rate` tokens per second. A request takes one token; with the
+# bucket empty it is rejected with 429 and a Retry-After of the time until
+# the next token.
+
+# Backends return 0 when the request is allowed, else seconds until it would be
+class MemoryRateLimitBackend:
+    blocking = False
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Dropping the least recently used bucket only resets it to full
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / rate
+
+# Buckets shared by every worker. The refill and take run in one Lua script
+# so concurrent workers cannot both spend the last token.
+TAKE_SCRIPT = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+class RedisRateLimitBackend:
+    blocking = True
+
+    def __init__(self, client, prefix: str = "assignments:ratelimit:"):
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        return float(self._take(keys=[self.prefix + key], args=[rate, burst, time.time()]))
+
+def make_backend(kind: str):
+    if kind == "memory":
+        return MemoryRateLimitBackend(max_keys=int(os.environ.get('RATE_LIMIT_MAX_KEYS', 100000)))
+    if kind == "redis":
+        import redis
+        return RedisRateLimitBackend(redis.Redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0')))
+    raise ValueError(f"Unknown rate limit backend: {kind}")
+
+
+class RateLimiter:
+    def __init__(self, backend, name: str, per_minute: float, burst: float):
+        self.backend = backend
+        self.name = name
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.allowed = 0
+        self.limited = 0
+
+    async def hit(self, key: str) -> None:
+        if self.rate <= 0:
+            return
+        bucket = f"{self.name}:{key}"
+        if self.backend.blocking:
+            retry_after = await run_in_threadpool(self.backend.take, bucket, self.rate, self.burst)
+        else:
+            retry_after = self.backend.take(bucket, self.rate, self.burst)
+        if retry_after > 0:
+            self.limited += 1
+            raise too_many_requests("Too many requests, try again later", retry_after)
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {
+            "per_minute": self.rate * 60,
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+def too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+# Behind a reverse proxy the client address is the first X-Forwarded-For hop
+TRUST_FORWARDED_FOR = os.environ.get('TRUST_FORWARDED_FOR', 'false').lower() in ('1', 'true', 'yes')
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+# RATE_LIMIT_BACKEND: memory (per process, default) or redis (shared between workers).
+# A limit of 0 per minute disables it.
+backend = make_backend(os.environ.get('RATE_LIMIT_BACKEND', 'memory'))
+login_ip_limiter = RateLimiter(
+    backend, "login:ip",
+    per_minute=float(os.environ.get('LOGIN_IP_PER_MINUTE', 60)),
+    burst=float(os.environ.get('LOGIN_IP_BURST', 20)),
+)
+login_username_limiter = RateLimiter(
+    backend, "login:user",
+    per_minute=float(os.environ.get('LOGIN_USERNAME_PER_MINUTE', 10)),
+    burst=float(os.environ.get('LOGIN_USERNAME_BURST', 5)),
+)
+signup_ip_limiter = RateLimiter(
+    backend, "signup:ip",
+    per_minute=float(os.environ.get('SIGNUP_IP_PER_MINUTE', 10)),
+    burst=float(os.environ.get('SIGNUP_IP_BURST', 5)),
+)
+signup_username_limiter = RateLimiter(
+    backend, "signup:user",
+    per_minute=float(os.environ.get('SIGNUP_USERNAME_PER_MINUTE', 5)),
+    burst=float(os.environ.get('SIGNUP_USERNAME_BURST', 3)),
+)
+
+
+# Admission control for password hashing
+# =============================================================
+# Rate limits are per client; this sheds load globally once more than
+# PASSWORD_POOL_MAX_QUEUED bcrypt calls are already waiting for a worker,
+# so a login burst cannot starve the cheap routes.
+PASSWORD_POOL_MAX_QUEUED = int(os.environ.get('PASSWORD_POOL_MAX_QUEUED', 64))
+ADMISSION_RETRY_AFTER_SECONDS = float(os.environ.get('ADMISSION_RETRY_AFTER_SECONDS', 2))
+
+class AdmissionControl:
+    def __init__(self, max_queued: int, retry_after: float):
+        self.max_queued = max_queued
+        self.retry_after = retry_after
+        self.admitted = 0
+        self.shed = 0
+
+    def admit(self, pool) -> None:
+        if self.max_queued > 0 and pool.queued >= self.max_queued:
+            self.shed += 1
+            raise too_many_requests("Server busy, try again later", self.retry_after)
+        self.admitted += 1
+
+    def stats(self) -> dict:
+        return {
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+password_admission = AdmissionControl(PASSWORD_POOL_MAX_QUEUED, ADMISSION_RETRY_AFTER_SECONDS)
+
+# Checks for the routes that hash or verify a password, cheapest first
+async def guard_login(request: Request, username: str) -> None:
+    password_admission.admit(password_pool)
+    await login_ip_limiter.hit(client_ip(request))
+    await login_username_limiter.hit(username.lower())
+
+async def guard_signup(request: Request, username: str) -> None:
+    password_admission.admit(password_pool)
+    await signup_ip_limiter.hit(client_ip(request))
+    await signup_username_limiter.hit(username.lower())
+
+def stats() -> dict:
+    return {
+        "backend": type(backend).__name__,
+        "limiters": {limiter.name: limiter.stats() for limiter in (
+            login_ip_limiter, login_username_limiter, signup_ip_limiter, signup_username_limiter,
+        )},
+        "admission": password_admission.stats(),
+    }
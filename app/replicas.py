@@ -0,0 +1,66 @@
+import itertools
+import math
+import os
+import threading
+import time
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+# Read/write split
+# =============================================================
+# Read-only routes get a session on a replica, chosen round-robin. A replica
+# that fails to connect is skipped for REPLICA_RETRY_SECONDS; with none
+# available reads go to the primary. Clients that committed a write in the
+# last READ_YOUR_WRITES_SECONDS read from the primary, so they see their own
+# writes despite replication lag. The write time travels with the client in
+# a cookie, so this holds whichever worker serves the next request.
+READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+REPLICA_RETRY_SECONDS = float(os.environ.get('REPLICA_RETRY_SECONDS', 30))
+
+class ReplicaSet:
+    def __init__(self, engines: list):
+        self.engines = engines
+        self._next = itertools.count()
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    # Healthy replicas, starting from the next one in round-robin order
+    def candidates(self) -> list:
+        if not self.engines:
+            return []
+        start = next(self._next) % len(self.engines)
+        ordered = self.engines[start:] + self.engines[:start]
+        now = time.monotonic()
+        with self._lock:
+            return [engine for engine in ordered if self._down_until.get(id(engine), 0) <= now]
+
+    def mark_down(self, engine) -> None:
+        with self._lock:
+            self._down_until[id(engine)] = time.monotonic() + REPLICA_RETRY_SECONDS
+
+
+# Unix time of the client's last commit. Only a routing hint: a forged or
+# stale value at worst sends that client's reads to the primary.
+LAST_WRITE_COOKIE = "last_write"
+
+def wrote_recently(request: Request) -> bool:
+    try:
+        return time.time() - float(request.cookies[LAST_WRITE_COOKIE]) < READ_YOUR_WRITES_SECONDS
+    except (KeyError, ValueError):
+        return False
+
+# Primary sessions carry the request's Response in session.info; committing
+# sets the cookie on it
+@event.listens_for(Session, "after_commit")
+def _mark_write(session: Session) -> None:
+    response = session.info.pop("response", None)
+    if response is not None:
+        response.set_cookie(
+            LAST_WRITE_COOKIE, f"{time.time():.3f}",
+            max_age=math.ceil(READ_YOUR_WRITES_SECONDS), httponly=True, samesite="lax",
+        )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from enum import Enum
 from typing import Optional
 from datetime import datetime, date, timedelta
@@ -60,12 +60,46 @@ class CourseResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class CoursePage(BaseModel):
+    items: list[CourseResponse]
+    next_cursor: Optional[int] = None
+
+class CourseSearchPage(BaseModel):
+    items: list[CourseResponse]
+    next_offset: Optional[int] = None
+
 class EnrollResponse(BaseModel):
     username: str
     course_name: str
     course_code: str
     lecturer_id: int
 
+class BulkEnrollRequest(BaseModel):
+    user_ids: list[int] = Field(default_factory=list, max_length=5000)
+    usernames: list[str] = Field(default_factory=list, max_length=5000)
+
+class BulkEnrollResult(BaseModel):
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    status: str
+
+class BulkEnrollResponse(BaseModel):
+    course_code: str
+    enrolled: int
+    already_enrolled: int
+    not_found: int
+    results: list[BulkEnrollResult]
+
+class DashboardCourse(BaseModel):
+    course_id: int
+    course_code: str
+    course_name: str
+    enrollment_count: int
+    assignment_count: int
+    next_due_date: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 class AssignmentCreate(BaseModel):
     course_id: int
     assignment_title: str
@@ -80,12 +114,29 @@ class AssignmentResponse(BaseModel):
     description: Optional[str] = None
     due_date: datetime
 
+class DeadlineItem(BaseModel):
+    assignment_id: int
+    course_id: int
+    course_code: str
+    course_name: str
+    assignment_title: str
+    due_date: datetime
 
-
-    
-
+class DeadlinePage(BaseModel):
+    items: list[DeadlineItem]
+    next_cursor: Optional[str] = None
 
 
 
+    
 
+class SubmissionResponse(BaseModel):
+    submission_id: int
+    assignment_id: int
+    filename: str
+    content_type: str
+    size: int
+    file_sha256: str
+    submitted_at: Optional[datetime] = None
 
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,26 @@
+import json
+import os
+from typing import Any
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+# Fast serialization for list endpoints
+# =============================================================
+# With FAST_SERIALIZATION=true, list endpoints select only the columns they
+# return, build plain dicts and answer with FastJSONResponse. That skips the
+# per-row Pydantic models, FastAPI's response_model re-validation and
+# jsonable_encoder. Uses orjson when installed, compact stdlib json otherwise.
+FAST_SERIALIZATION = os.environ.get('FAST_SERIALIZATION', 'false').lower() in ('1', 'true', 'yes')
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
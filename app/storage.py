@@ -0,0 +1,174 @@
+import hashlib
+import os
+import tempfile
+from typing import Optional
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.exceptions import FormParserError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.exceptions import FormParserError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+
+# Content-addressed submission storage
+# =============================================================
+# Files are stored once per distinct content under
+# <SUBMISSION_STORAGE_DIR>/<sha[:2]>/<sha[2:4]>/<sha256>.
+# Blobs are never deleted, including ones a resubmission no longer points
+# at: content is shared between submissions, and removing it safely needs a
+# reference check that races with a concurrent upload of the same bytes.
+# Reclaim space offline by deleting blobs no submissions.file_sha256 names.
+SUBMISSION_STORAGE_DIR = os.path.abspath(os.environ.get('SUBMISSION_STORAGE_DIR', 'submissions'))
+MAX_SUBMISSION_BYTES = int(os.environ.get('MAX_SUBMISSION_BYTES', 50 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Room for boundaries, part headers and small form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+class SubmissionTooLarge(Exception):
+    pass
+
+class InvalidUpload(Exception):
+    pass
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(SUBMISSION_STORAGE_DIR, sha256[:2], sha256[2:4], sha256)
+
+# Hashes the file while writing it to a temp file, then moves it into place
+class BlobWriter:
+    def __init__(self):
+        tmp_dir = os.path.join(SUBMISSION_STORAGE_DIR, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        self._out = os.fdopen(fd, "wb")
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > MAX_SUBMISSION_BYTES:
+            raise SubmissionTooLarge()
+        self._digest.update(chunk)
+        self._out.write(chunk)
+
+    # Returns (sha256, size)
+    def commit(self) -> tuple[str, int]:
+        self._out.close()
+        sha256 = self._digest.hexdigest()
+        final_path = blob_path(sha256)
+        if os.path.exists(final_path):
+            # Same content already stored
+            os.remove(self.tmp_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(self.tmp_path, final_path)
+        return sha256, self.size
+
+    def abort(self) -> None:
+        self._out.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+# Incremental multipart parser that sends the bytes of the `field` part
+# straight to a BlobWriter; other parts are dropped
+class _UploadParser:
+    def __init__(self, boundary: bytes, field: str):
+        self.field = field.encode()
+        self.writer: Optional[BlobWriter] = None
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self._headers: dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file_part = False
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._in_file_part = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        # Only the first file part is kept
+        if options.get(b"name") != self.field or self.writer is not None:
+            return
+        self._in_file_part = True
+        self.filename = options.get(b"filename", b"").decode("utf-8", "replace") or None
+        content_type = self._headers.get(b"content-type")
+        self.content_type = content_type.decode("latin-1") if content_type else None
+        self.writer = BlobWriter()
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file_part:
+            self.writer.write(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_file_part = False
+
+    def write(self, data: bytes) -> None:
+        self._parser.write(data)
+
+    def finalize(self) -> None:
+        self._parser.finalize()
+
+# Stream a multipart/form-data request body into storage without spooling
+# it first. Returns (sha256, size, filename, content_type) of the `field`
+# part. Oversized bodies are refused from Content-Length before anything is
+# read, and cut off as soon as the file passes MAX_SUBMISSION_BYTES.
+async def save_upload(request: Request, field: str = "file") -> tuple[str, int, Optional[str], Optional[str]]:
+    max_body = MAX_SUBMISSION_BYTES + MULTIPART_OVERHEAD_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_body:
+        raise SubmissionTooLarge()
+    media_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if media_type != b"multipart/form-data" or b"boundary" not in options:
+        raise InvalidUpload("Expected a multipart/form-data body")
+
+    parser = _UploadParser(options[b"boundary"], field)
+    received = 0
+    buffer = bytearray()
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_body:
+                raise SubmissionTooLarge()
+            buffer += chunk
+            # Parsing, hashing and disk writes happen off the event loop
+            if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                await run_in_threadpool(parser.write, bytes(buffer))
+                buffer.clear()
+        await run_in_threadpool(parser.write, bytes(buffer))
+        parser.finalize()
+        if parser.writer is None:
+            raise InvalidUpload(f"Missing '{field}' file part")
+        sha256, size = await run_in_threadpool(parser.writer.commit)
+    except FormParserError as exc:
+        if parser.writer is not None:
+            parser.writer.abort()
+        raise InvalidUpload(str(exc))
+    except BaseException:
+        if parser.writer is not None:
+            parser.writer.abort()
+        raise
+    return sha256, size, parser.filename, parser.content_type
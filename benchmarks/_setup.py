@@ -0,0 +1,49 @@
+# Shared setup for the benchmark scripts.
+#
+# The app uses flat imports (`import crud`, `from database import ...`), so the
+# scripts put app/ on sys.path and point DB_URL at a throwaway SQLite file
+# unless the caller already configured one.
+import os
+import statistics
+import sys
+import tempfile
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+
+
+def configure(db_name: str = "bench.db") -> str:
+    os.environ.setdefault("DB_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), db_name))
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    # Every simulated client shares one address; measure the app, not the limits
+    for limit in ("LOGIN_IP_PER_MINUTE", "LOGIN_USERNAME_PER_MINUTE", "SIGNUP_IP_PER_MINUTE",
+                  "SIGNUP_USERNAME_PER_MINUTE", "PASSWORD_POOL_MAX_QUEUED"):
+        os.environ.setdefault(limit, "0")
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    return os.environ["DB_URL"]
+
+
+# httpx.ASGITransport does not send lifespan events, so engines, migrations
+# and job workers are started here
+def run_lifespan(app):
+    return app.router.lifespan_context(app)
+
+
+def percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(50) * 1000,
+        "p95_ms": pct(95) * 1000,
+        "p99_ms": pct(99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
@@ -0,0 +1,82 @@
+"""Cost of get_current_user for subject tokens vs. claims tokens.
+
+    python benchmarks/bench_auth_modes.py --iterations 5000
+
+Runs the dependency directly against a seeded user and reports time per call
+and SQL statements per call, with the user / token-version caches cold
+(cleared before every call) and warm.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from _setup import configure
+
+configure("auth_modes.db")
+
+from sqlalchemy import event  # noqa: E402
+
+import auth  # noqa: E402
+import migrations  # noqa: E402
+import model  # noqa: E402
+from cache import token_version_cache, user_cache  # noqa: E402
+from database import SessionLocal, init_engines  # noqa: E402
+
+engine = init_engines()
+
+
+def seed_user(db):
+    user = db.query(model.Users).filter(model.Users.username == "bench_user").first()
+    if user is None:
+        user = model.Users(full_name="Bench User", username="bench_user", email="bench@example.com",
+                           hashed_password="x", role="lecturer")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    return user
+
+
+async def measure(db, token: str, iterations: int, cold: bool) -> dict:
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            if cold:
+                user_cache.clear()
+                token_version_cache.clear()
+            await auth.get_current_user(db=db, token=token)
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return {"us_per_call": elapsed / iterations * 1e6, "sql_per_call": statements[0] / iterations}
+
+
+async def main(args):
+    migrations.upgrade(engine)
+    db = SessionLocal()
+    try:
+        user = seed_user(db)
+        tokens = {}
+        for token_format in ("subject", "claims"):
+            auth.TOKEN_FORMAT = token_format
+            tokens[token_format] = auth.create_access_token(data=auth.token_data(user))
+        report = {}
+        for token_format, token in tokens.items():
+            for cold in (True, False):
+                label = f"{token_format}_{'cold' if cold else 'warm'}_cache"
+                report[label] = await measure(db, token, args.iterations, cold)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
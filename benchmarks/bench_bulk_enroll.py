@@ -0,0 +1,93 @@
+"""Bulk cohort enrollment vs. the per-user enroll path.
+
+    python benchmarks/bench_bulk_enroll.py --cohort 500
+
+Both paths are run against the crud layer with a fresh course each, counting
+SQL statements and commits on the engine.
+"""
+import argparse
+import json
+import time
+
+from _setup import configure
+
+configure("bulk_enroll.db")
+
+from sqlalchemy import event, insert  # noqa: E402
+
+import crud  # noqa: E402
+import model  # noqa: E402
+from database import Base, SessionLocal, init_engines  # noqa: E402
+
+engine = init_engines()
+
+
+class Counter:
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._on_execute)
+        event.remove(engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args):
+        self.statements += 1
+
+    def _on_commit(self, *args):
+        self.commits += 1
+
+
+def seed(db, cohort: int):
+    lecturer = model.Users(full_name="Lecturer", username="bench_lecturer", email="lecturer@example.com", hashed_password="x", role="lecturer")
+    db.add(lecturer)
+    db.flush()
+    db.execute(insert(model.Users), [
+        {"full_name": f"Student {i}", "username": f"student{i}", "email": f"student{i}@example.com", "hashed_password": "x", "role": "student"}
+        for i in range(cohort)
+    ])
+    courses = [model.Course(course_name=f"Course {code}", course_code=code, lecturer_id=lecturer.user_id) for code in ("PER-USER", "BULK")]
+    db.add_all(courses)
+    db.commit()
+    student_ids = [row.user_id for row in db.query(model.Users.user_id).filter(model.Users.role == "student")]
+    return courses[0].course_id, courses[1].course_id, student_ids
+
+
+def per_user(db, course_id: int, student_ids: list[int]):
+    # Mirrors enroll_in_course: course lookup, insert-or-conflict + commit
+    for user_id in student_ids:
+        crud.get_course_by_id(db, course_id)
+        crud.new_enroll(db, user_id, course_id)
+
+
+def main(args):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        per_user_course, bulk_course, student_ids = seed(db, args.cohort)
+        report = {"cohort": args.cohort}
+        for name, run in (
+            ("per_user", lambda: per_user(db, per_user_course, student_ids)),
+            ("bulk", lambda: crud.bulk_enroll(db, bulk_course, student_ids, [])),
+        ):
+            with Counter() as counter:
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+            report[name] = {"seconds": elapsed, "statements": counter.statements, "commits": counter.commits}
+        report["speedup"] = report["per_user"]["seconds"] / report["bulk"]["seconds"]
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cohort", type=int, default=500)
+    main(parser.parse_args())
@@ -0,0 +1,85 @@
+"""Course search latency as the catalogue grows.
+
+    python benchmarks/bench_course_search.py --courses 10000 50000 --queries 200
+
+For each catalogue size, seeds that many courses with varied names, codes
+and descriptions, then times crud.search_courses for a mix of full-word,
+prefix and multi-term queries, reporting p50/p95/p99 per size. Latency
+should stay roughly flat across sizes when the full-text index is used.
+"""
+import argparse
+import json
+import random
+import time
+
+from _setup import configure, percentiles
+
+configure("course_search.db")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+import crud  # noqa: E402
+import migrations  # noqa: E402
+import model  # noqa: E402
+from database import Base, SessionLocal, init_engines  # noqa: E402
+
+engine = init_engines()
+
+SUBJECTS = ["Data", "Software", "Organic", "Applied", "Modern", "Linear", "Digital", "Quantum", "Medieval", "Financial"]
+TOPICS = ["Structures", "Engineering", "Chemistry", "Statistics", "History", "Algebra", "Systems", "Mechanics", "Literature", "Accounting"]
+LEVELS = ["Introduction to", "Advanced", "Topics in", "Foundations of", "Seminar on"]
+QUERIES = ["data", "structures", "linear algebra", "quantum mech", "intro", "CSC00", "history medieval", "account", "eng", "seminar financial"]
+
+
+def seed(courses: int) -> None:
+    rng = random.Random(42)
+    Base.metadata.drop_all(bind=engine)
+    migrations.upgrade(engine)
+    db = SessionLocal()
+    try:
+        db.execute(insert(model.Users), [
+            {"full_name": "Lecturer", "username": "lecturer", "email": "lecturer@example.com", "hashed_password": "x", "role": "lecturer"},
+        ])
+        lecturer_id = db.scalar(select(model.Users.user_id))
+        rows = []
+        for i in range(courses):
+            subject, topic = rng.choice(SUBJECTS), rng.choice(TOPICS)
+            rows.append({
+                "course_name": f"{rng.choice(LEVELS)} {subject} {topic}",
+                "course_code": f"{rng.choice(['CSC', 'MTH', 'PHY', 'HIS', 'ACC'])}{i:06d}",
+                "description": f"{subject} {topic.lower()} covering {rng.choice(TOPICS).lower()} and {rng.choice(SUBJECTS).lower()} methods",
+                "lecturer_id": lecturer_id,
+            })
+        db.execute(insert(model.Course), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def measure(queries: int, limit: int) -> dict:
+    db = SessionLocal()
+    try:
+        samples = []
+        for i in range(queries):
+            started = time.perf_counter()
+            crud.search_courses(db, QUERIES[i % len(QUERIES)], limit=limit)
+            samples.append(time.perf_counter() - started)
+        return percentiles(samples)
+    finally:
+        db.close()
+
+
+def main(args):
+    report = {"dialect": engine.dialect.name, "limit": args.limit, "sizes": {}}
+    for courses in args.courses:
+        seed(courses)
+        report["sizes"][courses] = measure(args.queries, args.limit)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,83 @@
+"""p99 latency of GET /courses/ while logins run concurrently.
+
+    python benchmarks/bench_login_contention.py --mode pool
+    python benchmarks/bench_login_contention.py --mode inline
+
+``inline`` runs bcrypt directly on the event loop (the old behaviour) so the
+two runs can be compared. PASSWORD_POOL_KIND / PASSWORD_POOL_WORKERS /
+PASSWORD_POOL_MAX_IN_FLIGHT select the pool configuration for ``pool``.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from _setup import configure, percentiles, run_lifespan
+
+configure("login_contention.db")
+
+import httpx  # noqa: E402
+
+import auth  # noqa: E402
+import migrations  # noqa: E402
+from main import app  # noqa: E402
+
+
+async def _inline_run(fn, *args):
+    return fn(*args)
+
+
+async def login_loop(client: httpx.AsyncClient, stop: asyncio.Event, counter: list):
+    while not stop.is_set():
+        await client.post("/users/login/", data={"username": "bench_user", "password": "bench-password"})
+        counter[0] += 1
+
+
+async def poll_courses(client: httpx.AsyncClient, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/courses/")
+        response.raise_for_status()
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+
+
+async def main(args):
+    if args.mode == "inline":
+        auth.password_pool.run = _inline_run
+
+    migrations.upgrade()
+    transport = httpx.ASGITransport(app=app)
+    async with run_lifespan(app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/users/signup/", json={
+            "full_name": "Bench User",
+            "email": "bench@example.com",
+            "username": "bench_user",
+            "password": "bench-password",
+            "role": "student",
+        })
+        stop = asyncio.Event()
+        logins = [0]
+        samples: list[float] = []
+        tasks = [asyncio.create_task(login_loop(client, stop, logins)) for _ in range(args.logins)]
+        tasks.append(asyncio.create_task(poll_courses(client, stop, samples)))
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    report = {
+        "mode": args.mode,
+        "concurrent_logins": args.logins,
+        "logins_completed": logins[0],
+        "get_courses": percentiles(samples),
+        "password_pool": auth.password_pool.stats(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["pool", "inline"], default="pool")
+    parser.add_argument("--logins", type=int, default=16, help="concurrent login loops")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    asyncio.run(main(parser.parse_args()))
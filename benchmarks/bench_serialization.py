@@ -0,0 +1,92 @@
+"""Per-row CPU cost of list endpoints with and without FAST_SERIALIZATION.
+
+    python benchmarks/bench_serialization.py --rows 2000 --requests 50
+
+Seeds --rows courses and enrolls one student in all of them, then calls
+GET /courses/?limit=200 and GET /users/me/enrollments in process with the
+default path and with the fast path, reporting process CPU time per
+serialized row.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from _setup import configure, run_lifespan
+
+configure("serialization.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+import auth  # noqa: E402
+import migrations  # noqa: E402
+import model  # noqa: E402
+import serialization  # noqa: E402
+from database import Base, SessionLocal, init_engines  # noqa: E402
+from main import app  # noqa: E402
+
+engine = init_engines()
+
+
+def seed(rows: int) -> str:
+    Base.metadata.drop_all(bind=engine)
+    migrations.upgrade(engine)
+    db = SessionLocal()
+    try:
+        db.execute(insert(model.Users), [
+            {"full_name": "Lecturer", "username": "lecturer", "email": "lecturer@example.com", "hashed_password": "x", "role": "lecturer"},
+            {"full_name": "Student", "username": "student", "email": "student@example.com", "hashed_password": "x", "role": "student"},
+        ])
+        lecturer_id, student_id = db.scalars(select(model.Users.user_id).order_by(model.Users.user_id)).all()
+        db.execute(insert(model.Course), [
+            {"course_name": f"Course {i}", "course_code": f"C{i:06d}", "description": f"Description of course {i}", "lecturer_id": lecturer_id}
+            for i in range(rows)
+        ])
+        course_ids = db.scalars(select(model.Course.course_id)).all()
+        db.execute(insert(model.Enrollment), [{"user_id": student_id, "course_id": course_id} for course_id in course_ids])
+        db.commit()
+        student = db.get(model.Users, student_id)
+        return auth.create_access_token(data=auth.token_data(student))
+    finally:
+        db.close()
+
+
+async def measure(client, path: str, headers: dict, requests: int) -> dict:
+    response = await client.get(path, headers=headers)
+    body = response.json()
+    rows_per_request = len(body["items"]) if isinstance(body, dict) else len(body)
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for _ in range(requests):
+        (await client.get(path, headers=headers)).raise_for_status()
+    cpu = time.process_time() - cpu_started
+    wall = time.perf_counter() - started
+    return {
+        "rows_per_request": rows_per_request,
+        "cpu_us_per_row": cpu / (requests * rows_per_request) * 1e6,
+        "wall_ms_per_request": wall / requests * 1000,
+    }
+
+
+async def main(args):
+    token = seed(args.rows)
+    headers = {"Authorization": f"Bearer {token}"}
+    report = {"orjson": serialization.orjson is not None}
+    transport = httpx.ASGITransport(app=app)
+    async with run_lifespan(app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for fast in (False, True):
+            serialization.FAST_SERIALIZATION = fast
+            mode = "fast" if fast else "default"
+            report[mode] = {
+                "GET /courses/?limit=200": await measure(client, "/courses/?limit=200", headers, args.requests),
+                "GET /users/me/enrollments": await measure(client, "/users/me/enrollments", headers, args.requests),
+            }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,108 @@
+"""Cold-start cost of the app: import time and time to first request.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --migrate            # also migrate on startup
+    python benchmarks/bench_startup.py --save-baseline      # record a baseline
+    python benchmarks/bench_startup.py --check              # fail on regression
+
+Each run starts a fresh interpreter that imports main (import time), then
+runs the app lifespan and serves GET / in process (time to first request,
+including engine setup). With --migrate the lifespan also migrates an
+empty SQLite file, as RUN_MIGRATIONS_ON_STARTUP=true does.
+Reports p50/p95 of both; baselines and --check work as in deadline_rush.py.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+from _setup import APP_DIR, configure, percentiles
+
+configure("startup.db")
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+CHILD = """
+import asyncio, json, sys, time
+sys.path.insert(0, {app_dir!r})
+started = time.perf_counter()
+import httpx
+from main import app
+imported = time.perf_counter()
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/")
+        response.raise_for_status()
+        return time.perf_counter()
+
+served = asyncio.run(first_request())
+print(json.dumps({{"import_s": imported - started, "first_request_s": served - started}}))
+"""
+
+
+def run_once(fresh_db: bool, migrate: bool) -> dict:
+    env = dict(os.environ)
+    env["RUN_MIGRATIONS_ON_STARTUP"] = "true" if migrate else "false"
+    if fresh_db:
+        env["DB_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-"), "startup.db")
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(app_dir=APP_DIR)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for metric in ("import", "first_request"):
+        current, base = report[metric]["p50_ms"], baseline[metric]["p50_ms"]
+        if current > base * (1 + tolerance):
+            regressions.append(f"{metric}: p50 {current:.1f} ms > baseline {base:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--migrate", action="store_true", help="run migrations in the lifespan")
+    parser.add_argument("--reuse-db", action="store_true", help="keep one database across runs (schema already migrated)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    samples = [run_once(fresh_db=not args.reuse_db, migrate=args.migrate) for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "migrate": args.migrate,
+        "reuse_db": args.reuse_db,
+        "python": platform.python_version(),
+        "import": percentiles([sample["import_s"] for sample in samples]),
+        "first_request": percentiles([sample["first_request_s"] for sample in samples]),
+    }
+    print(json.dumps(report, indent=2))
+
+    baseline_path = os.path.join(BASELINE_DIR, "startup_migrate.json" if args.migrate else "startup.json")
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {baseline_path}")
+    if args.check:
+        if not os.path.exists(baseline_path):
+            sys.exit(f"No baseline at {baseline_path}; run with --save-baseline first")
+        with open(baseline_path) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("Startup regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Deadline-rush load test against the FastAPI app, in process.
+
+    python benchmarks/deadline_rush.py --scale small --duration 30
+    python benchmarks/deadline_rush.py --save-baseline      # record a baseline
+    python benchmarks/deadline_rush.py --check              # fail on regression
+
+Seeds the database (see seed.py), then runs --concurrency virtual students
+that replay the traffic mix in TRAFFIC_MIX for --duration seconds. Reports
+throughput and p50/p95/p99 per route. Any status not in EXPECTED_STATUSES
+counts as an error. Baselines are stored per scale in benchmarks/baselines/
+(the committed small one was recorded on a developer machine; re-record it
+on the machine that runs --check); --check exits non-zero when a route has
+errors, or its p95 or the overall throughput is worse than the baseline by
+more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+
+from _setup import configure, percentiles, run_lifespan
+
+configure("deadline_rush.db")
+
+import httpx  # noqa: E402
+
+import auth  # noqa: E402
+from main import app  # noqa: E402
+import model  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from seed import SEED_PASSWORD, seed  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# (weight, route label, request builder)
+TRAFFIC_MIX = [
+    (5, "POST /users/login/", lambda s, ctx: ("POST", "/users/login/", {"data": {"username": s, "password": SEED_PASSWORD}})),
+    (30, "GET /users/me/enrollments", lambda s, ctx: ("GET", "/users/me/enrollments", {})),
+    (30, "GET /assignments/{assignment_id}", lambda s, ctx: ("GET", f"/assignments/{ctx['rng'].choice(ctx['assignment_ids'])}", {})),
+    (20, "GET /courses/{course_id}", lambda s, ctx: ("GET", f"/courses/{ctx['rng'].choice(ctx['course_ids'])}", {})),
+    (15, "GET /courses/", lambda s, ctx: ("GET", "/courses/", {})),
+]
+
+# Anything else (a 401 from a bad token, say) is an error. Every seeded
+# student has enrollments, but 404 is the route's normal empty answer.
+EXPECTED_STATUSES = {
+    "GET /users/me/enrollments": {200, 404},
+}
+
+
+async def virtual_student(client, username, token, ctx, deadline, samples, errors):
+    weights = [weight for weight, _, _ in TRAFFIC_MIX]
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        _, route, build = ctx["rng"].choices(TRAFFIC_MIX, weights=weights)[0]
+        method, path, kwargs = build(username, ctx)
+        started = time.perf_counter()
+        response = await client.request(method, path, headers=headers, **kwargs)
+        samples[route].append(time.perf_counter() - started)
+        if response.status_code not in EXPECTED_STATUSES.get(route, {200}):
+            errors[route] += 1
+
+
+async def run(args) -> dict:
+    seeded = seed(args.scale)
+    ctx = {"rng": random.Random(7), "course_ids": seeded["course_ids"], "assignment_ids": seeded["assignment_ids"]}
+    students = ctx["rng"].sample(seeded["students"], min(args.concurrency, len(seeded["students"])))
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    # Tokens as /users/login/ issues them, so TOKEN_FORMAT applies
+    db = SessionLocal()
+    try:
+        users = db.query(model.Users).filter(model.Users.username.in_(students)).all()
+        tokens = {user.username: auth.create_access_token(data=auth.token_data(user)) for user in users}
+    finally:
+        db.close()
+
+    # Unhandled app errors come back as 500s and are counted, not raised
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with run_lifespan(app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            virtual_student(client, username, tokens[username], ctx, deadline, samples, errors)
+            for username in students
+        ))
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(route_samples) for route_samples in samples.values())
+    return {
+        "scale": args.scale,
+        "concurrency": len(students),
+        "duration_s": elapsed,
+        "requests": total,
+        "throughput_rps": total / elapsed,
+        "counts": seeded["counts"],
+        "python": platform.python_version(),
+        "routes": {
+            route: {**percentiles(route_samples), "errors": errors[route], "rps": len(route_samples) / elapsed}
+            for route, route_samples in sorted(samples.items())
+        },
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = [
+        f"{route}: {stats['errors']} unexpected responses"
+        for route, stats in report["routes"].items() if stats["errors"]
+    ]
+    if report["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        regressions.append(f"throughput {report['throughput_rps']:.1f} rps < baseline {baseline['throughput_rps']:.1f} rps")
+    for route, stats in report["routes"].items():
+        base = baseline["routes"].get(route)
+        if base and stats.get("p95_ms", 0) > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {stats['p95_ms']:.1f} ms > baseline {base['p95_ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", default="small")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+
+    baseline_path = os.path.join(BASELINE_DIR, f"deadline_rush_{args.scale}.json")
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {baseline_path}")
+    if args.check:
+        if not os.path.exists(baseline_path):
+            sys.exit(f"No baseline at {baseline_path}; run with --save-baseline first")
+        with open(baseline_path) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("Performance regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Seed a database with realistic volumes for benchmarking.
+
+    python benchmarks/seed.py --scale medium
+
+Uses DB_URL when set (SQLite or PostgreSQL), otherwise a throwaway SQLite
+file. All students share one bcrypt hash of SEED_PASSWORD so seeding does
+not spend minutes hashing.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from _setup import configure
+
+configure("seed.db")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+import auth  # noqa: E402
+import migrations  # noqa: E402
+import model  # noqa: E402
+from database import Base, SessionLocal, init_engines  # noqa: E402
+
+engine = init_engines()
+
+SEED_PASSWORD = "bench-password"
+
+SCALES = {
+    "small": {"students": 1000, "lecturers": 20, "courses": 100, "courses_per_student": 5, "assignments_per_course": 4},
+    "medium": {"students": 10000, "lecturers": 200, "courses": 1000, "courses_per_student": 6, "assignments_per_course": 6},
+    "large": {"students": 50000, "lecturers": 800, "courses": 5000, "courses_per_student": 7, "assignments_per_course": 8},
+}
+
+BATCH_SIZE = 5000
+
+
+def _insert(db, table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(table), rows[start:start + BATCH_SIZE])
+
+
+def seed(scale: str = "small", rng_seed: int = 42) -> dict:
+    config = SCALES[scale]
+    rng = random.Random(rng_seed)
+    Base.metadata.drop_all(bind=engine)
+    migrations.upgrade(engine)
+    hashed_password = auth.hash_password(SEED_PASSWORD)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    db = SessionLocal()
+    try:
+        _insert(db, model.Users, [
+            {"full_name": f"Lecturer {i}", "username": f"lecturer{i}", "email": f"lecturer{i}@example.com",
+             "hashed_password": hashed_password, "role": "lecturer"}
+            for i in range(config["lecturers"])
+        ] + [
+            {"full_name": f"Student {i}", "username": f"student{i}", "email": f"student{i}@example.com",
+             "hashed_password": hashed_password, "role": "student"}
+            for i in range(config["students"])
+        ])
+        lecturer_ids = list(db.scalars(select(model.Users.user_id).where(model.Users.role == "lecturer")))
+        student_ids = list(db.scalars(select(model.Users.user_id).where(model.Users.role == "student")))
+
+        _insert(db, model.Course, [
+            {"course_name": f"Course {i}", "course_code": f"C{i:05d}", "description": f"Description of course {i}",
+             "lecturer_id": lecturer_ids[i % len(lecturer_ids)]}
+            for i in range(config["courses"])
+        ])
+        courses = db.execute(select(model.Course.course_id, model.Course.lecturer_id)).all()
+        course_ids = [course.course_id for course in courses]
+
+        _insert(db, model.Enrollment, [
+            {"user_id": user_id, "course_id": course_id}
+            for user_id in student_ids
+            for course_id in rng.sample(course_ids, config["courses_per_student"])
+        ])
+
+        # Most assignments fall due within the next few days: the rush
+        _insert(db, model.Assignment, [
+            {"course_id": course.course_id, "lecturer_id": course.lecturer_id,
+             "assignment_title": f"Assignment {n} for course {course.course_id}",
+             "description": "Submit before the deadline",
+             "due_date": now + timedelta(hours=rng.uniform(-72, 24 * 14))}
+            for course in courses
+            for n in range(config["assignments_per_course"])
+        ])
+        db.commit()
+        assignment_ids = list(db.scalars(select(model.Assignment.assignment_id)))
+    finally:
+        db.close()
+
+    return {
+        "scale": scale,
+        "students": [f"student{i}" for i in range(config["students"])],
+        "course_ids": course_ids,
+        "assignment_ids": assignment_ids,
+        "counts": {
+            "users": len(lecturer_ids) + len(student_ids),
+            "courses": len(course_ids),
+            "enrollments": len(student_ids) * config["courses_per_student"],
+            "assignments": len(assignment_ids),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    result = seed(args.scale)
+    print(json.dumps({"db_url": engine.url.render_as_string(hide_password=True), "counts": result["counts"],
+                      "seconds": time.perf_counter() - started}, indent=2))
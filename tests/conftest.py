@@ -0,0 +1,99 @@
+# Shared fixtures for the API tests.
+#
+# The app uses flat imports (`import crud`, `from database import ...`) and
+# reads its settings from the environment at import, so app/ goes on sys.path
+# and the settings are filled in before anything is imported. Engines are
+# built in the app lifespan, so each test gets its own SQLite file by
+# pointing database.SQLALCHEMY_DATABASE_URL at it before the client starts.
+import os
+import sys
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+
+os.environ.setdefault("DB_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="tests-"), "import.db"))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("JOBS_BACKEND", "memory")
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import auth  # noqa: E402
+import cache  # noqa: E402
+import database  # noqa: E402
+import main  # noqa: E402
+import model  # noqa: E402
+import ratelimit  # noqa: E402
+
+TEST_PASSWORD = "test-password"
+_hashed_password = None
+
+
+def sqlite_url(path) -> str:
+    return f"sqlite:///{path}"
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    # Caches and limiters are process-wide; start every test empty
+    cache.user_cache.clear()
+    cache.token_version_cache.clear()
+    monkeypatch.setattr(cache.course_cache, "backend", cache.MemoryBackend(maxsize=1000, ttl=60))
+    monkeypatch.setattr(ratelimit, "backend", ratelimit.MemoryRateLimitBackend())
+    for limiter in (ratelimit.login_ip_limiter, ratelimit.login_username_limiter,
+                    ratelimit.signup_ip_limiter, ratelimit.signup_username_limiter):
+        monkeypatch.setattr(limiter, "backend", ratelimit.backend)
+
+
+@pytest.fixture
+def db_url(tmp_path, monkeypatch):
+    url = sqlite_url(tmp_path / "app.db")
+    monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", url)
+    monkeypatch.setattr(main, "RUN_MIGRATIONS_ON_STARTUP", True)
+    return url
+
+
+@pytest.fixture
+def client(db_url):
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(client):
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def make_user(db, username: str, role: str = "student") -> dict:
+    # Hash once: bcrypt per user would dominate the test run
+    global _hashed_password
+    if _hashed_password is None:
+        _hashed_password = auth.hash_password(TEST_PASSWORD)
+    user = model.Users(
+        full_name=username.title(),
+        username=username,
+        email=f"{username}@example.com",
+        hashed_password=_hashed_password,
+        role=role,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    token = auth.create_access_token(data=auth.token_data(user))
+    return {"user_id": user.user_id, "username": username, "headers": {"Authorization": f"Bearer {token}"}}
+
+
+def make_course(db, lecturer_id: int, code: str, name: str = None, description: str = None) -> int:
+    course = model.Course(course_name=name or f"Course {code}", course_code=code, description=description, lecturer_id=lecturer_id)
+    db.add(course)
+    db.commit()
+    return course.course_id
@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import APP_DIR
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+# DB_ASYNC is read at import, so the app runs in a fresh interpreter
+SCRIPT = """
+import json
+from fastapi.testclient import TestClient
+import crud_async
+import database
+import main
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+assert database.DB_ASYNC and crud_async.AsyncSession is AsyncSession
+seen = []
+
+def token(client, username, role):
+    user = {"username": username, "full_name": username.title(), "email": username + "@example.com",
+            "password": "test-password", "role": role}
+    assert client.post("/users/signup/", json=user).status_code == 200
+    response = client.post("/users/login/", data={"username": username, "password": "test-password"})
+    return {"Authorization": "Bearer " + response.json()["access_token"]}
+
+with TestClient(main.app) as client:
+    # Statements run through the async engine, not the sync one
+    event.listen(database.async_engine.sync_engine, "before_cursor_execute", lambda *args: seen.append(args[2]))
+    lecturer = token(client, "lecturer", "lecturer")
+    student = token(client, "student", "student")
+    created = client.post("/courses/", json={"course_name": "Algebra", "course_code": "MTH101"}, headers=lecturer)
+    assert created.status_code == 200
+    # First course in a fresh database
+    enrolled = client.post("/courses/1/enroll", headers=student)
+    again = client.post("/courses/1/enroll", headers=student)
+    enrollments = client.get("/users/me/enrollments", headers=student)
+    print(json.dumps({
+        "enrolled": enrolled.status_code,
+        "again": again.status_code,
+        "enrollments": enrollments.json(),
+        "by_code": client.get("/courses/code/MTH101").json()["course_name"],
+        "async_statements": len(seen),
+    }))
+"""
+
+
+def test_async_mode_serves_reads_and_writes(tmp_path):
+    env = dict(os.environ)
+    env.update({
+        "DB_ASYNC": "true",
+        "DB_URL": f"sqlite:///{tmp_path / 'async.db'}",
+        "RUN_MIGRATIONS_ON_STARTUP": "true",
+        "PYTHONPATH": APP_DIR,
+    })
+    env.pop("ASYNC_DB_URL", None)
+    env.pop("DB_REPLICA_URLS", None)
+    completed = subprocess.run([sys.executable, "-c", SCRIPT], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert result["enrolled"] == 200
+    assert result["again"] == 400
+    assert [row["course_code"] for row in result["enrollments"]] == ["MTH101"]
+    assert result["by_code"] == "Algebra"
+    assert result["async_statements"] > 0
@@ -0,0 +1,52 @@
+import pytest
+
+import auth
+from conftest import make_user
+
+
+def test_revoke_tokens_rejects_subject_token(client, db, monkeypatch):
+    monkeypatch.setattr(auth, "TOKEN_FORMAT", "subject")
+    student = make_user(db, "student")
+    assert client.get("/users/me/enrollments", headers=student["headers"]).status_code == 404
+
+    assert client.post("/users/me/revoke-tokens", headers=student["headers"]).status_code == 200
+    assert client.get("/users/me/enrollments", headers=student["headers"]).status_code == 401
+
+
+def test_revoke_tokens_rejects_claims_token(client, db, monkeypatch):
+    monkeypatch.setattr(auth, "TOKEN_FORMAT", "claims")
+    student = make_user(db, "student")
+    assert client.get("/users/me/enrollments", headers=student["headers"]).status_code == 404
+
+    assert client.post("/users/me/revoke-tokens", headers=student["headers"]).status_code == 200
+    assert client.get("/users/me/enrollments", headers=student["headers"]).status_code == 401
+
+
+def test_token_without_user_id_is_refused(client, db, monkeypatch):
+    monkeypatch.setattr(auth, "TOKEN_FORMAT", "subject")
+    make_user(db, "student")
+    for claims in ({"sub": "student"}, {"sub": "student", "ver": 0}):
+        legacy = {"Authorization": "Bearer " + auth.create_access_token(data=claims)}
+        assert client.get("/users/me/enrollments", headers=legacy).status_code == 401
+
+
+def test_versionless_token_refused_in_claims_mode(client, db, monkeypatch):
+    make_user(db, "student")
+    legacy = {"Authorization": "Bearer " + auth.create_access_token(data={"sub": "student"})}
+    monkeypatch.setattr(auth, "TOKEN_FORMAT", "claims")
+    assert client.get("/users/me/enrollments", headers=legacy).status_code == 401
+
+
+@pytest.mark.parametrize("token_format", ["subject", "claims"])
+def test_renamed_users_token_does_not_pass_as_the_new_owner(client, db, monkeypatch, token_format):
+    monkeypatch.setattr(auth, "TOKEN_FORMAT", token_format)
+    alice = make_user(db, "alice")
+    renamed = {"username": "alice2", "full_name": "Alice", "email": "alice2@example.com"}
+    assert client.put("/users/me", json=renamed, headers=alice["headers"]).status_code == 200
+
+    # Someone else takes the freed username; both accounts are at token version 0
+    impostor = make_user(db, "alice")
+    taken = {"username": "mallory", "full_name": "Mallory", "email": "mallory@example.com"}
+    assert client.put("/users/me", json=taken, headers=alice["headers"]).status_code == 401
+    assert client.get("/users/me/enrollments", headers=alice["headers"]).status_code == 401
+    assert client.get("/users/me/enrollments", headers=impostor["headers"]).status_code == 404
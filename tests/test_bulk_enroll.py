@@ -0,0 +1,69 @@
+from sqlalchemy import event, select
+
+import crud
+import database
+import model
+from conftest import make_course, make_user
+
+
+def bulk_enroll(client, course_id: int, headers: dict, **cohort):
+    response = client.post(f"/courses/{course_id}/enroll/bulk", json=cohort, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def enrollment_count(db, course_id: int) -> int:
+    db.expire_all()
+    return db.scalar(select(model.CourseStats.enrollment_count).where(model.CourseStats.course_id == course_id))
+
+
+def test_bulk_enroll_reports_each_user_once(client, db, monkeypatch):
+    monkeypatch.setattr(crud, "DASHBOARD_SUMMARY", True)
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    alice = make_user(db, "alice")
+    bob = make_user(db, "bob")
+    course_id = make_course(db, lecturer["user_id"], "CS101")
+    db.add(model.CourseStats(course_id=course_id))
+    db.commit()
+
+    body = bulk_enroll(client, course_id, lecturer["headers"],
+                       user_ids=[alice["user_id"], bob["user_id"], 999], usernames=["alice", "nobody"])
+    assert (body["enrolled"], body["already_enrolled"], body["not_found"]) == (2, 0, 2)
+    assert [(result["username"], result["status"]) for result in body["results"]] == [
+        ("alice", "enrolled"), ("bob", "enrolled"), (None, "not_found"), ("nobody", "not_found"),
+    ]
+    assert enrollment_count(db, course_id) == 2
+
+    body = bulk_enroll(client, course_id, lecturer["headers"], user_ids=[alice["user_id"]], usernames=["alice"])
+    assert (body["enrolled"], body["already_enrolled"]) == (0, 1)
+    assert enrollment_count(db, course_id) == 2
+
+
+def test_bulk_enroll_skips_rows_enrolled_concurrently(client, db, monkeypatch):
+    monkeypatch.setattr(crud, "DASHBOARD_SUMMARY", True)
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    alice = make_user(db, "alice")
+    bob = make_user(db, "bob")
+    course_id = make_course(db, lecturer["user_id"], "CS101")
+    db.add(model.CourseStats(course_id=course_id))
+    db.commit()
+
+    # Bob enrolls himself between the existing-enrollment check and the insert
+    raced = []
+
+    def enroll_bob_first(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO enrollments") and not raced:
+            raced.append(True)
+            cursor.execute("INSERT INTO enrollments (user_id, course_id) VALUES (?, ?)", (bob["user_id"], course_id))
+
+    event.listen(database.engine, "before_cursor_execute", enroll_bob_first)
+    try:
+        body = bulk_enroll(client, course_id, lecturer["headers"], user_ids=[alice["user_id"], bob["user_id"]])
+    finally:
+        event.remove(database.engine, "before_cursor_execute", enroll_bob_first)
+    assert raced
+    assert [(result["username"], result["status"]) for result in body["results"]] == [
+        ("alice", "enrolled"), ("bob", "already_enrolled"),
+    ]
+    assert (body["enrolled"], body["already_enrolled"]) == (1, 1)
+    assert enrollment_count(db, course_id) == 1
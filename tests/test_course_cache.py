@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+import cache
+from conftest import make_course, make_user
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = cache.FakeRedis()
+    monkeypatch.setattr(cache.course_cache, "backend", cache.RedisBackend(client))
+    monkeypatch.setattr(cache.course_cache, "hits", 0)
+    monkeypatch.setattr(cache.course_cache, "misses", 0)
+    return client
+
+
+def test_course_lookups_read_through_redis_backend(client, db, redis_client):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    course_id = make_course(db, lecturer["user_id"], "CS101", name="Intro")
+
+    assert client.get(f"/courses/{course_id}").json()["course_name"] == "Intro"
+    # One miss fills both keys, stored as JSON under the prefix
+    assert redis_client.get(f"assignments:course:id:{course_id}") is not None
+    assert redis_client.get("assignments:course:code:CS101") is not None
+    assert client.get(f"/courses/{course_id}").json()["course_code"] == "CS101"
+    assert client.get("/courses/code/CS101").json()["course_name"] == "Intro"
+
+    stats = client.get("/metrics/course-cache").json()
+    assert stats["backend"] == "RedisBackend"
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_course_update_invalidates_redis_backend(client, db, redis_client):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    course_id = make_course(db, lecturer["user_id"], "CS101", name="Intro")
+    assert client.get(f"/courses/{course_id}").status_code == 200
+
+    response = client.put(f"/courses/{course_id}", json={"course_name": "Advanced", "course_code": "CS201"}, headers=lecturer["headers"])
+    assert response.status_code == 200
+    assert redis_client.get("assignments:course:code:CS101") is None
+    assert client.get("/courses/code/CS101").status_code == 404
+    assert client.get(f"/courses/{course_id}").json() == {"course_name": "Advanced", "course_code": "CS201", "description": None}
+    assert client.get("/courses/code/CS201").json()["course_name"] == "Advanced"
+
+
+
+def test_counters_are_exact_under_concurrent_lookups():
+    course_cache = cache.CourseCache(cache.MemoryBackend(maxsize=10, ttl=60), ttl=60)
+    course_cache.set(cache.CachedCourse(course_id=1, course_name="Algebra", course_code="MTH101", description=None, lecturer_id=1))
+
+    def lookup():
+        for _ in range(2000):
+            course_cache.get_by_id(1)
+            course_cache.get_by_id(2)
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = course_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (16000, 16000)
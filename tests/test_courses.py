@@ -0,0 +1,58 @@
+import pytest
+
+import serialization
+from conftest import make_course, make_user
+
+MAX_CHAR = "\U0010ffff"
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_code_prefix_matches_only_prefixed_codes(client, db, monkeypatch, fast):
+    monkeypatch.setattr(serialization, "FAST_SERIALIZATION", fast)
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    for code in ("CS101", "CS201", "CT101", "C" + MAX_CHAR, "C" + MAX_CHAR + "1", "D101", "퟿A", "B"):
+        make_course(db, lecturer["user_id"], code)
+
+    def codes(prefix):
+        response = client.get("/courses/", params={"code_prefix": prefix})
+        assert response.status_code == 200
+        return sorted(item["course_code"] for item in response.json()["items"])
+
+    assert codes("CS") == ["CS101", "CS201"]
+    # U+10FFFF has no successor, so the range must not be built from chr(ord + 1)
+    assert codes("C" + MAX_CHAR) == ["C" + MAX_CHAR, "C" + MAX_CHAR + "1"]
+    assert codes(MAX_CHAR) == []
+    # The successor of U+D7FF would be a surrogate
+    assert codes("퟿") == ["퟿A"]
+
+
+@pytest.mark.parametrize("fast", [False, True])
+@pytest.mark.parametrize("filtered", [False, True])
+def test_next_cursor_walks_every_page(client, db, monkeypatch, fast, filtered):
+    monkeypatch.setattr(serialization, "FAST_SERIALIZATION", fast)
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    other = make_user(db, "other", role="lecturer")
+    expected = []
+    # Interleave owners so a filtered page skips ids
+    for i in range(7):
+        owner = lecturer if i % 3 else other
+        make_course(db, owner["user_id"], f"CS{i:03d}")
+        if owner is lecturer or not filtered:
+            expected.append(f"CS{i:03d}")
+
+    params = {"limit": 2}
+    if filtered:
+        params["lecturer_id"] = lecturer["user_id"]
+    seen, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/courses/", params={**params, **({"cursor": cursor} if cursor is not None else {})})
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen += [item["course_code"] for item in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+    assert pages == (len(expected) + 1) // 2
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select
+
+import crud
+import database
+import model
+from conftest import make_course, make_user
+
+
+def dashboard(client, headers: dict) -> list[dict]:
+    response = client.get("/lecturers/me/dashboard", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def grouped_dashboard(client, headers: dict, monkeypatch) -> list[dict]:
+    with monkeypatch.context() as patch:
+        patch.setattr(crud, "DASHBOARD_SUMMARY", False)
+        return dashboard(client, headers)
+
+
+def create_assignment(client, headers: dict, course_id: int, due_date: datetime) -> None:
+    assignment = {"course_id": course_id, "assignment_title": "Homework", "due_date": due_date.isoformat()}
+    assert client.post("/assignments/", json=assignment, headers=headers).status_code == 200
+
+
+def test_grouped_query_counts_per_course(client, db):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    other = make_user(db, "other", role="lecturer")
+    students = [make_user(db, f"student{i}") for i in range(3)]
+    first = make_course(db, lecturer["user_id"], "CS101")
+    second = make_course(db, lecturer["user_id"], "CS102")
+    make_course(db, other["user_id"], "OT101")
+    for student in students:
+        db.add(model.Enrollment(user_id=student["user_id"], course_id=first))
+    db.add(model.Enrollment(user_id=students[0]["user_id"], course_id=second))
+    now = datetime.utcnow().replace(microsecond=0)
+    for due_date in (now - timedelta(days=1), now + timedelta(days=3), now + timedelta(days=1)):
+        db.add(model.Assignment(course_id=first, lecturer_id=lecturer["user_id"], assignment_title="Homework", due_date=due_date))
+    db.commit()
+
+    rows = dashboard(client, lecturer["headers"])
+    assert [(row["course_code"], row["enrollment_count"], row["assignment_count"]) for row in rows] == [
+        ("CS101", 3, 3), ("CS102", 1, 0),
+    ]
+    # Past due dates are not "next"
+    assert rows[0]["next_due_date"] == (now + timedelta(days=1)).isoformat()
+    assert rows[1]["next_due_date"] is None
+    assert client.get("/lecturers/me/dashboard", headers=students[0]["headers"]).status_code == 403
+
+
+def test_summary_counters_match_grouped_query(client, db, monkeypatch):
+    monkeypatch.setattr(crud, "DASHBOARD_SUMMARY", True)
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    students = [make_user(db, f"student{i}") for i in range(4)]
+    created = client.post("/courses/", json={"course_name": "Algebra", "course_code": "MTH101"}, headers=lecturer["headers"])
+    assert created.status_code == 200
+    course_id = db.scalar(select(model.Course.course_id).where(model.Course.course_code == "MTH101"))
+    # Created with the course, so the first read needs no refresh
+    assert db.get(model.CourseStats, course_id) is not None
+
+    for student in students[:2]:
+        assert client.post(f"/courses/{course_id}/enroll", headers=student["headers"]).status_code == 200
+    bulk = {"user_ids": [student["user_id"] for student in students]}
+    assert client.post(f"/courses/{course_id}/enroll/bulk", json=bulk, headers=lecturer["headers"]).status_code == 200
+    assert client.delete(f"/courses/{course_id}/unenroll", headers=students[3]["headers"]).status_code == 200
+    now = datetime.utcnow().replace(microsecond=0)
+    create_assignment(client, lecturer["headers"], course_id, now + timedelta(days=5))
+    create_assignment(client, lecturer["headers"], course_id, now + timedelta(days=2))
+
+    summary = dashboard(client, lecturer["headers"])
+    assert summary == grouped_dashboard(client, lecturer["headers"], monkeypatch)
+    assert (summary[0]["enrollment_count"], summary[0]["assignment_count"]) == (3, 2)
+    assert summary[0]["next_due_date"] == (now + timedelta(days=2)).isoformat()
+
+
+def test_summary_rebuilds_missing_and_stale_rows(client, db, monkeypatch):
+    monkeypatch.setattr(crud, "DASHBOARD_SUMMARY", True)
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    student = make_user(db, "student")
+    missing = make_course(db, lecturer["user_id"], "CS101")
+    stale = make_course(db, lecturer["user_id"], "CS102")
+    db.add(model.Enrollment(user_id=student["user_id"], course_id=missing))
+    now = datetime.utcnow().replace(microsecond=0)
+    db.add(model.Assignment(course_id=stale, lecturer_id=lecturer["user_id"], assignment_title="Homework", due_date=now + timedelta(days=4)))
+    # The stored next due date has passed; the real next one is later
+    db.add(model.CourseStats(course_id=stale, enrollment_count=0, assignment_count=1, next_due_date=now - timedelta(hours=1)))
+    db.commit()
+
+    summary = dashboard(client, lecturer["headers"])
+    assert summary == grouped_dashboard(client, lecturer["headers"], monkeypatch)
+    assert summary[0]["enrollment_count"] == 1
+    assert summary[1]["next_due_date"] == (now + timedelta(days=4)).isoformat()
+    db.expire_all()
+    assert db.get(model.CourseStats, missing).enrollment_count == 1
+    assert db.get(model.CourseStats, stale).next_due_date == now + timedelta(days=4)
+
+
+@pytest.mark.parametrize("existing_count", [0, 7])
+def test_concurrent_first_reads_do_not_conflict(client, db, monkeypatch, existing_count):
+    monkeypatch.setattr(crud, "DASHBOARD_SUMMARY", True)
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    student = make_user(db, "student")
+    course_id = make_course(db, lecturer["user_id"], "CS101")
+    db.add(model.Enrollment(user_id=student["user_id"], course_id=course_id))
+    db.commit()
+
+    # Another request creates the summary row just before this one writes it
+    raced = []
+
+    def insert_first(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO course_stats") and not raced:
+            raced.append(True)
+            cursor.execute("INSERT INTO course_stats (course_id, enrollment_count, assignment_count) VALUES (?, ?, 0)", (course_id, existing_count))
+
+    event.listen(database.engine, "before_cursor_execute", insert_first)
+    try:
+        summary = dashboard(client, lecturer["headers"])
+    finally:
+        event.remove(database.engine, "before_cursor_execute", insert_first)
+    assert raced
+    assert summary[0]["enrollment_count"] == 1
+    db.expire_all()
+    assert db.get(model.CourseStats, course_id).enrollment_count == 1
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+import database
+import model
+from conftest import make_course, make_user
+
+
+def seed_feed(db):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    student = make_user(db, "student")
+    course_ids = [make_course(db, lecturer["user_id"], code) for code in ("CSC101", "CSC102")]
+    due = datetime.utcnow() + timedelta(days=2)
+    for course_id in course_ids:
+        db.add(model.Enrollment(user_id=student["user_id"], course_id=course_id))
+        db.add(model.Assignment(course_id=course_id, lecturer_id=lecturer["user_id"], assignment_title="Essay", due_date=due))
+    db.commit()
+    return lecturer, student, course_ids
+
+
+def test_not_modified_skips_the_feed_query(client, db):
+    _, student, _ = seed_feed(db)
+    first = client.get("/users/me/deadlines", headers=student["headers"])
+    assert first.status_code == 200
+    assert len(first.json()["items"]) == 2
+    assert "Last-Modified" not in first.headers
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(database.engine, "before_cursor_execute", listener)
+    try:
+        second = client.get("/users/me/deadlines", headers={**student["headers"], "If-None-Match": first.headers["ETag"]})
+    finally:
+        event.remove(database.engine, "before_cursor_execute", listener)
+    assert second.status_code == 304
+    assert not any("assignment_title" in statement for statement in statements)
+
+
+def test_unenroll_changes_the_etag(client, db):
+    _, student, course_ids = seed_feed(db)
+    etag = client.get("/users/me/deadlines", headers=student["headers"]).headers["ETag"]
+    assert client.delete(f"/courses/{course_ids[0]}/unenroll", headers=student["headers"]).status_code == 200
+
+    response = client.get("/users/me/deadlines", headers={**student["headers"], "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 1
+
+
+def test_course_rename_changes_the_etag(client, db):
+    lecturer, student, course_ids = seed_feed(db)
+    etag = client.get("/users/me/deadlines", headers=student["headers"]).headers["ETag"]
+    renamed = client.put(f"/courses/{course_ids[0]}", headers=lecturer["headers"], json={"course_name": "Renamed"})
+    assert renamed.status_code == 200
+
+    response = client.get("/users/me/deadlines", headers={**student["headers"], "If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Renamed" in [item["course_name"] for item in response.json()["items"]]
@@ -0,0 +1,47 @@
+from sqlalchemy import event, insert
+
+import database
+import model
+import serialization
+from cache import token_version_cache, user_cache
+from conftest import make_course, make_user
+
+
+def seed_enrollments(db, lecturer_id: int, student_id: int, count: int, prefix: str) -> None:
+    course_ids = [make_course(db, lecturer_id, f"{prefix}{i:04d}") for i in range(count)]
+    db.execute(insert(model.Enrollment), [{"user_id": student_id, "course_id": course_id} for course_id in course_ids])
+    db.commit()
+
+
+def count_statements(client, headers: dict) -> tuple[int, list]:
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # Cold caches, so both measurements include the same auth lookups
+    user_cache.clear()
+    token_version_cache.clear()
+    event.listen(database.engine, "before_cursor_execute", on_execute)
+    try:
+        response = client.get("/users/me/enrollments", headers=headers)
+    finally:
+        event.remove(database.engine, "before_cursor_execute", on_execute)
+    assert response.status_code == 200
+    return len(statements), response.json()
+
+
+def test_enrollments_query_count_does_not_grow_with_enrollments(client, db, monkeypatch):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    few = make_user(db, "few")
+    many = make_user(db, "many")
+    seed_enrollments(db, lecturer["user_id"], few["user_id"], 5, "F")
+    seed_enrollments(db, lecturer["user_id"], many["user_id"], 50, "M")
+
+    for fast in (False, True):
+        monkeypatch.setattr(serialization, "FAST_SERIALIZATION", fast)
+        few_count, few_body = count_statements(client, few["headers"])
+        many_count, many_body = count_statements(client, many["headers"])
+        assert len(few_body) == 5
+        assert len(many_body) == 50
+        assert few_count == many_count
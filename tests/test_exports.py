@@ -0,0 +1,46 @@
+import json
+
+import exports
+import model
+from conftest import make_course, make_user
+
+
+def seed(db):
+    alice = make_user(db, "alice", role="lecturer")
+    bob = make_user(db, "bob", role="lecturer")
+    student = make_user(db, "student")
+    for lecturer, code in ((alice, "ALC101"), (bob, "BOB101")):
+        course_id = make_course(db, lecturer["user_id"], code)
+        db.add(model.Enrollment(user_id=student["user_id"], course_id=course_id))
+    db.commit()
+    return alice, student, make_user(db, "registrar", role="admin")
+
+
+def exported_codes(client, headers) -> list[str]:
+    response = client.get("/exports/enrollments", headers=headers)
+    assert response.status_code == 200
+    return [json.loads(line)["course_code"] for line in response.text.splitlines()]
+
+
+def test_lecturers_export_only_their_own_enrollments(client, db):
+    alice, student, registrar = seed(db)
+    assert exported_codes(client, alice["headers"]) == ["ALC101"]
+    assert exported_codes(client, registrar["headers"]) == ["ALC101", "BOB101"]
+    assert client.get("/exports/enrollments", headers=student["headers"]).status_code == 403
+
+
+def test_ndjson_sends_the_first_row_on_its_own():
+    rows = [{"n": i} for i in range(3)]
+    chunks = list(exports._ndjson_chunks(rows))
+    assert chunks[0] == '{"n": 0}\n'
+    assert "".join(chunks) == "".join(json.dumps(row) + "\n" for row in rows)
+    assert list(exports._ndjson_chunks([])) == []
+
+
+def test_signup_cannot_self_register_an_admin(client, db):
+    seed(db)
+    user = {"username": "mallory", "full_name": "Mallory", "email": "mallory@example.com", "password": "test-password", "role": "admin"}
+    assert client.post("/users/signup/", json=user).status_code == 403
+    login = client.post("/users/login/", data={"username": "mallory", "password": "test-password"})
+    assert login.status_code == 401
+    assert db.query(model.Users).filter(model.Users.username == "mallory").first() is None
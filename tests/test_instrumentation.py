@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import database
+import instrumentation
+import main
+from cache import token_version_cache, user_cache
+from conftest import make_course, make_user
+
+
+@pytest.fixture
+def metrics_client(db_url, monkeypatch):
+    # The middleware is added at import when METRICS_ENABLED is set, so wrap the app here
+    monkeypatch.setattr(instrumentation, "METRICS_ENABLED", True)
+    monkeypatch.setattr(instrumentation, "registry", instrumentation.MetricsRegistry())
+    with TestClient(instrumentation.MetricsMiddleware(main.app)) as client:
+        yield client
+
+
+def samples(client) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    values = {}
+    for line in response.text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            values[name] = float(value)
+    return values
+
+
+def test_routes_are_labelled_by_template_with_sql_and_auth_time(metrics_client):
+    db = database.SessionLocal()
+    student = make_user(db, "student")
+    course_id = make_course(db, student["user_id"], "CS101")
+    db.close()
+    statements = []
+    event.listen(database.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert metrics_client.get(f"/courses/{course_id}").status_code == 200
+    assert metrics_client.get(f"/courses/{course_id}").status_code == 200
+    course_statements = len(statements)
+    # Cold caches, so authentication queries the database
+    user_cache.clear()
+    token_version_cache.clear()
+    assert metrics_client.get("/users/me/enrollments", headers=student["headers"]).status_code == 404
+    enrollment_statements = len(statements) - course_statements
+    assert metrics_client.get("/no/such/route").status_code == 404
+
+    values = samples(metrics_client)
+    course = 'method="GET",route="/courses/{course_id}"'
+    enrollments = 'method="GET",route="/users/me/enrollments"'
+    assert values["http_requests_total{" + course + ',status="200"}'] == 2
+    assert values["http_requests_total{" + enrollments + ',status="404"}'] == 1
+    assert values['http_requests_total{method="GET",route="unmatched",status="404"}'] == 1
+    assert not any(f"/courses/{course_id}" in name for name in values)
+
+    assert values["http_request_sql_statements_total{" + course + "}"] == course_statements
+    assert values["http_request_sql_statements_total{" + enrollments + "}"] == enrollment_statements
+    assert values["http_request_duration_seconds_count{" + course + "}"] == 2
+    assert values["http_request_duration_seconds_bucket{" + course + ',le="+Inf"}'] == 2
+    assert values["http_request_auth_duration_seconds_total{" + enrollments + "}"] > 0
+    assert values["http_request_auth_duration_seconds_total{" + course + "}"] == 0
+    assert values["db_statements_total"] >= course_statements + enrollment_statements
+
+
+def test_metrics_endpoint_is_404_when_disabled(client):
+    assert not instrumentation.METRICS_ENABLED
+    assert client.get("/metrics").status_code == 404
@@ -0,0 +1,49 @@
+import time
+
+import jobs
+from jobs import Job, JobQueue, SQLiteJobStore
+
+
+def test_new_store_does_not_release_live_claims(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    worker = SQLiteJobStore(path, maxsize=100, lease=0.2)
+    worker.put(Job(handler="h", event="e", payload={"n": 1}))
+    claimed = worker.get(timeout=0)
+    assert claimed is not None
+
+    # Another worker process starting up must not run the claimed job again
+    other = SQLiteJobStore(path, maxsize=100, lease=0.2)
+    assert other.get(timeout=0) is None
+
+    # Once the lease runs out the claim counts as lost and is taken over
+    time.sleep(0.3)
+    reclaimed = other.get(timeout=0)
+    assert reclaimed is not None and reclaimed.id == claimed.id
+
+
+def test_sqlite_store_caps_depth_without_counting_on_put(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), maxsize=2, lease=60)
+    statements = []
+    store._conn.set_trace_callback(statements.append)
+    assert store.put(Job(handler="h", event="e", payload={}))
+    assert store.put(Job(handler="h", event="e", payload={}))
+    assert not store.put(Job(handler="h", event="e", payload={}))
+    assert not any("COUNT" in statement for statement in statements)
+
+    store.ack(store.get(timeout=0))
+    assert store.put(Job(handler="h", event="e", payload={}))
+
+
+def test_store_is_built_on_first_use():
+    built = []
+
+    def factory():
+        built.append(True)
+        return jobs.MemoryJobStore(maxsize=10)
+
+    queue = JobQueue(factory, workers=1, max_attempts=1, retry_base=0, retry_max=0)
+    assert queue.store is None and not built
+    queue.on("event")(lambda payload: None)
+    queue.publish("event", {})
+    assert built == [True]
+    assert queue.stats()["depth"] == 1
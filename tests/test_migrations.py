@@ -0,0 +1,27 @@
+from sqlalchemy import create_engine, event, text
+
+import migrations
+from conftest import sqlite_url
+
+
+def test_dedupe_runs_only_until_the_unique_index_exists(tmp_path):
+    engine = create_engine(sqlite_url(tmp_path / "legacy.db"))
+    migrations.upgrade(engine)
+    # A database from before the unique index, with a duplicated enrollment
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ux_enrollments_user_id_course_id"))
+        connection.execute(text(
+            "INSERT INTO users (user_id, full_name, username, email, hashed_password, role, token_version) "
+            "VALUES (1, 'L', 'l', 'l@example.com', 'x', 'lecturer', 0)"
+        ))
+        connection.execute(text("INSERT INTO courses (course_id, course_name, course_code, lecturer_id, revision) VALUES (1, 'C', 'C1', 1, 0)"))
+        connection.execute(text("INSERT INTO enrollments (user_id, course_id) VALUES (1, 1), (1, 1)"))
+
+    migrations.upgrade(engine)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM enrollments")).scalar() == 1
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    migrations.upgrade(engine)
+    assert not any("DELETE FROM enrollments" in statement for statement in statements)
@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio.to_thread
+from fastapi.testclient import TestClient
+
+import database
+import main
+from cache import token_version_cache, user_cache
+from conftest import make_user
+
+
+def test_sessions_wait_for_a_connection_without_blocking_threads(db_url, monkeypatch):
+    # One connection and two worker threads: a request holding the connection
+    # needs a thread for its next query while the others wait for it
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(database, "DB_POOL_TIMEOUT", 5)
+    with TestClient(main.app) as client:
+        client.portal.call(lambda: setattr(anyio.to_thread.current_default_thread_limiter(), "total_tokens", 2))
+        db = database.SessionLocal()
+        students = [make_user(db, f"student{i}") for i in range(8)]
+        db.close()
+        user_cache.clear()
+        token_version_cache.clear()
+        with ThreadPoolExecutor(len(students)) as pool:
+            statuses = list(pool.map(lambda student: client.get("/users/me/enrollments", headers=student["headers"]).status_code, students))
+    assert statuses == [404] * len(students)
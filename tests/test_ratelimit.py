@@ -0,0 +1,95 @@
+import pytest
+
+import ratelimit
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    # Tight buckets that do not refill during a test
+    def limit(limiter, burst: float):
+        monkeypatch.setattr(limiter, "burst", burst)
+        monkeypatch.setattr(limiter, "rate", 1 / 60)
+        monkeypatch.setattr(limiter, "allowed", 0)
+        monkeypatch.setattr(limiter, "limited", 0)
+    return limit
+
+
+def login(client, username: str, headers: dict = None):
+    return client.post("/users/login/", data={"username": username, "password": "wrong"}, headers=headers)
+
+
+def test_bucket_allows_burst_then_refills():
+    backend = ratelimit.MemoryRateLimitBackend()
+    assert [backend.take("key", rate=1.0, burst=3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    retry_after = backend.take("key", rate=1.0, burst=3)
+    assert 0 < retry_after <= 1
+    # Two seconds later two tokens are back, but never more than the burst
+    tokens, updated_at = backend._buckets["key"]
+    backend._buckets["key"] = (tokens, updated_at - 2)
+    assert backend.take("key", rate=1.0, burst=3) == 0.0
+    assert backend.take("key", rate=1.0, burst=3) == 0.0
+    assert backend.take("key", rate=1.0, burst=3) > 0
+    assert backend.take("other", rate=1.0, burst=3) == 0.0
+
+
+def test_bucket_keeps_only_max_keys():
+    backend = ratelimit.MemoryRateLimitBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        backend.take(key, rate=1.0, burst=1)
+    assert list(backend._buckets) == ["b", "c"]
+
+
+def test_login_is_limited_per_username(client, limits):
+    limits(ratelimit.login_username_limiter, burst=2)
+    assert [login(client, "alice").status_code for _ in range(2)] == [401, 401]
+    limited = login(client, "ALICE")
+    assert limited.status_code == 429
+    # The next token is a minute away at one per minute
+    assert 1 <= int(limited.headers["Retry-After"]) <= 60
+    assert login(client, "bob").status_code == 401
+    assert client.get("/metrics/rate-limit").json()["limiters"]["login:user"]["limited"] == 1
+
+
+def test_login_is_limited_per_client_address(client, limits, monkeypatch):
+    limits(ratelimit.login_ip_limiter, burst=3)
+    monkeypatch.setattr(ratelimit, "TRUST_FORWARDED_FOR", True)
+    first = {"X-Forwarded-For": "203.0.113.1, 10.0.0.1"}
+    assert [login(client, f"user{i}", first).status_code for i in range(3)] == [401, 401, 401]
+    limited = login(client, "user3", first)
+    assert limited.status_code == 429
+    assert "Retry-After" in limited.headers
+    assert login(client, "user3", {"X-Forwarded-For": "203.0.113.2"}).status_code == 401
+
+
+def test_signup_is_limited_per_username(client, limits):
+    limits(ratelimit.signup_username_limiter, burst=1)
+    user = {"username": "alice", "full_name": "Alice", "email": "not-an-email", "password": "test-password", "role": "student"}
+    # Invalid bodies are rejected before the limiter
+    assert client.post("/users/signup/", json=user).status_code == 422
+    user["email"] = "alice@example.com"
+    assert client.post("/users/signup/", json=user).status_code == 200
+    limited = client.post("/users/signup/", json=user)
+    assert limited.status_code == 429
+    assert "Retry-After" in limited.headers
+
+
+def test_password_routes_are_shed_when_the_pool_is_backed_up(client, monkeypatch):
+    admission = ratelimit.password_admission
+    monkeypatch.setattr(admission, "max_queued", 2)
+    monkeypatch.setattr(admission, "shed", 0)
+    monkeypatch.setattr(admission, "admitted", 0)
+    monkeypatch.setattr(ratelimit.password_pool, "queued", 1)
+    assert login(client, "alice").status_code == 401
+
+    monkeypatch.setattr(ratelimit.password_pool, "queued", 2)
+    for response in (login(client, "alice"), client.post("/users/signup/", json={
+        "username": "bob", "full_name": "Bob", "email": "bob@example.com", "password": "test-password", "role": "student",
+    })):
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == str(int(ratelimit.ADMISSION_RETRY_AFTER_SECONDS))
+    assert client.get("/metrics/rate-limit").json()["admission"] == {"max_queued": 2, "admitted": 1, "shed": 2}
+
+
+def test_retry_after_rounds_up_to_whole_seconds():
+    assert ratelimit.too_many_requests("busy", 0.01).headers["Retry-After"] == "1"
+    assert ratelimit.too_many_requests("busy", 2.2).headers["Retry-After"] == "3"
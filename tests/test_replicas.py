@@ -0,0 +1,89 @@
+import shutil
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+import database
+import instrumentation
+import main
+from conftest import make_course, make_user, sqlite_url
+from replicas import LAST_WRITE_COOKIE
+
+
+@pytest.fixture
+def replicated(tmp_path, db_url, monkeypatch):
+    primary_path = tmp_path / "app.db"
+    replica_paths = [tmp_path / "replica1.db", tmp_path / "replica2.db"]
+    monkeypatch.setattr(database, "DB_REPLICA_URLS", [sqlite_url(path) for path in replica_paths])
+    monkeypatch.setattr(instrumentation, "METRICS_ENABLED", True)
+    with TestClient(main.app) as client:
+        db = database.SessionLocal()
+        lecturer = make_user(db, "lecturer", role="lecturer")
+        make_course(db, lecturer["user_id"], "CSC101", name="Original")
+        db.close()
+        # "Replicate": replicas start as copies of the primary
+        for path in replica_paths:
+            shutil.copy(primary_path, path)
+        # Then a change reaches the primary only, as with replication lag
+        with database.engine.begin() as connection:
+            connection.execute(text("UPDATE courses SET course_name = 'Primary only'"))
+        yield client, lecturer
+
+
+def course_names(client) -> list[str]:
+    return [item["course_name"] for item in client.get("/courses/").json()["items"]]
+
+
+def test_reads_go_to_replicas_until_the_client_writes(replicated):
+    client, lecturer = replicated
+    assert course_names(client) == ["Original"]
+
+    created = client.post("/courses/", headers=lecturer["headers"], json={"course_name": "New", "course_code": "CSC102"})
+    assert created.status_code == 200
+    assert LAST_WRITE_COOKIE in created.cookies
+
+    # The marker travels with the client, so any worker routes it to the primary
+    assert course_names(client) == ["Primary only", "New"]
+    client.cookies.clear()
+    assert course_names(client) == ["Original"]
+
+
+def test_unreachable_replica_is_skipped(tmp_path, db_url, monkeypatch):
+    broken = sqlite_url(tmp_path / "missing" / "replica.db")
+    monkeypatch.setattr(database, "DB_REPLICA_URLS", [broken])
+    with TestClient(main.app) as client:
+        db = database.SessionLocal()
+        lecturer = make_user(db, "lecturer", role="lecturer")
+        make_course(db, lecturer["user_id"], "CSC101", name="From primary")
+        db.close()
+        assert course_names(client) == ["From primary"]
+
+
+def test_replica_queries_are_instrumented_and_pooled_separately(replicated):
+    client, _ = replicated
+    replica_statements = []
+    listener = lambda conn, cursor, statement, *args: replica_statements.append(statement)  # noqa: E731
+    for replica in database.replica_engines:
+        assert event.contains(replica, "before_cursor_execute", instrumentation._before_cursor_execute)
+        event.listen(replica, "before_cursor_execute", listener)
+    for _ in range(2):
+        course_names(client)
+    assert replica_statements
+
+    stats = client.get("/metrics/db-pool").json()
+    assert len(stats["replicas"]) == 2
+    assert sum(replica["checkouts"] for replica in stats["replicas"].values()) >= 2
+    assert database.engine.pool.stats is not database.replica_engines[0].pool.stats
+
+
+def test_replica_reads_do_not_fill_the_course_cache(replicated):
+    client, lecturer = replicated
+    assert client.get("/courses/1").json()["course_name"] == "Original"
+    assert client.get("/courses/code/CSC101").json()["course_name"] == "Original"
+
+    # A client that just wrote reads the primary, not a replica row cached by someone else
+    client.cookies.set(LAST_WRITE_COOKIE, f"{time.time():.3f}")
+    assert client.get("/courses/1").json()["course_name"] == "Primary only"
+    assert client.get("/courses/code/CSC101").json()["course_name"] == "Primary only"
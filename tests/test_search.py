@@ -0,0 +1,93 @@
+import crud
+import database
+from conftest import make_course, make_user
+
+
+def search(client, q: str, **params) -> dict:
+    response = client.get("/courses/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def codes(client, q: str, **params) -> list[str]:
+    return [item["course_code"] for item in search(client, q, **params)["items"]]
+
+
+def test_index_follows_course_create_and_update(client, db):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    course = {"course_name": "Linear Algebra", "course_code": "MTH201", "description": "Vectors and matrices"}
+    assert client.post("/courses/", json=course, headers=lecturer["headers"]).status_code == 200
+    assert codes(client, "matrices") == ["MTH201"]
+
+    update = {"course_name": "Abstract Algebra", "description": "Groups and rings"}
+    assert client.put("/courses/code/MTH201", json=update, headers=lecturer["headers"]).status_code == 200
+    assert codes(client, "matrices") == []
+    assert codes(client, "rings") == ["MTH201"]
+    assert codes(client, "linear") == []
+
+
+def test_name_matches_rank_above_description_matches(client, db):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    make_course(db, lecturer["user_id"], "HIS101", name="History", description="Optics mentioned in passing")
+    make_course(db, lecturer["user_id"], "PHY101", name="Mechanics", description="Forces and motion today")
+    make_course(db, lecturer["user_id"], "OPT101", name="Optics", description="Lenses and light today")
+    make_course(db, lecturer["user_id"], "BIO101", name="Biology", description="Cells and tissues today")
+    assert codes(client, "optics") == ["OPT101", "HIS101"]
+    assert codes(client, "opt101") == ["OPT101"]
+
+
+def test_last_term_matches_as_a_prefix_and_all_terms_must_match(client, db):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    make_course(db, lecturer["user_id"], "PHY101", name="Introduction to Physics")
+    make_course(db, lecturer["user_id"], "PHY201", name="Advanced Physics")
+    make_course(db, lecturer["user_id"], "CHM101", name="Introduction to Chemistry")
+    assert sorted(codes(client, "phys")) == ["PHY101", "PHY201"]
+    assert codes(client, "introduction phys") == ["PHY101"]
+    # Only the last term is a prefix
+    assert codes(client, "intro phys") == []
+    assert search(client, "!!!") == {"items": [], "next_offset": None}
+
+
+def test_next_offset_pages_through_every_result(client, db):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    expected = [f"ART{i:03d}" for i in range(5)]
+    for code in expected:
+        make_course(db, lecturer["user_id"], code, name="Art History")
+
+    seen, offsets, offset = [], [], 0
+    while offset is not None:
+        page = search(client, "art", limit=2, offset=offset)
+        seen += [item["course_code"] for item in page["items"]]
+        offset = page["next_offset"]
+        offsets.append(offset)
+    assert offsets == [2, 4, None]
+    assert sorted(seen) == expected
+
+
+def test_offset_stops_at_the_cap(client, db, monkeypatch):
+    monkeypatch.setattr(crud, "SEARCH_MAX_OFFSET", 2)
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    for i in range(5):
+        make_course(db, lecturer["user_id"], f"ART{i:03d}", name="Art History")
+    # More rows exist, but a next_offset past the cap would be refused
+    assert search(client, "art", limit=2, offset=0)["next_offset"] == 2
+    assert search(client, "art", limit=2, offset=2)["next_offset"] is None
+    assert client.get("/courses/search", params={"q": "art", "offset": 1001}).status_code == 422
+
+
+def test_fallback_without_full_text_support(client, db, monkeypatch):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    make_course(db, lecturer["user_id"], "PHY101", name="Introduction to Physics", description="Forces")
+    make_course(db, lecturer["user_id"], "PHY201", name="Advanced Physics")
+    make_course(db, lecturer["user_id"], "CHM101", name="Chemistry", description="Physical chemistry")
+    monkeypatch.setattr(database.engine.dialect, "name", "other")
+    rows, next_offset = crud.search_courses(db, "PHYS", limit=2)
+    assert [row.course_code for row in rows] == ["PHY101", "PHY201"]
+    assert next_offset == 2
+    rows, next_offset = crud.search_courses(db, "phys forces", limit=2)
+    assert ([row.course_code for row in rows], next_offset) == (["PHY101"], None)
+
+
+def test_query_without_words_returns_nothing(client):
+    assert client.get("/courses/search", params={"q": ""}).status_code == 422
+    assert search(client, " ") == {"items": [], "next_offset": None}
@@ -0,0 +1,65 @@
+import pytest
+
+import model
+import serialization
+from conftest import make_course, make_user
+
+
+def both_modes(client, monkeypatch, path: str, **kwargs) -> tuple:
+    responses = []
+    for fast in (False, True):
+        with monkeypatch.context() as patch:
+            patch.setattr(serialization, "FAST_SERIALIZATION", fast)
+            responses.append(client.get(path, **kwargs))
+    return tuple(responses)
+
+
+def assert_same(model_response, fast_response) -> None:
+    assert fast_response.status_code == model_response.status_code
+    assert fast_response.headers["content-type"] == model_response.headers["content-type"]
+    # Same fields in the same order, not just equal values
+    assert list(fast_response.json()) == list(model_response.json())
+    assert fast_response.json() == model_response.json()
+
+
+@pytest.fixture
+def seeded(db):
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    student = make_user(db, "student")
+    courses = [
+        make_course(db, lecturer["user_id"], "CS101", name="Programming", description="Loops and functions"),
+        make_course(db, lecturer["user_id"], "CS102", name="Programming II"),
+        make_course(db, lecturer["user_id"], "CS103", name="Programming III", description=""),
+    ]
+    for course_id in courses:
+        db.add(model.Enrollment(user_id=student["user_id"], course_id=course_id))
+    db.commit()
+    return {"lecturer": lecturer, "student": student}
+
+
+@pytest.mark.parametrize("params", [{}, {"limit": 2}, {"code_prefix": "CS10", "limit": 1, "cursor": 1}])
+def test_course_page_matches_response_model(client, monkeypatch, seeded, params):
+    model_response, fast_response = both_modes(client, monkeypatch, "/courses/", params=params)
+    assert_same(model_response, fast_response)
+    items = fast_response.json()["items"]
+    assert all(list(item) == ["course_name", "course_code", "description"] for item in items)
+    if not params:
+        assert [item["description"] for item in items] == ["Loops and functions", None, ""]
+
+
+def test_search_matches_response_model(client, monkeypatch, seeded):
+    model_response, fast_response = both_modes(client, monkeypatch, "/courses/search", params={"q": "programming", "limit": 2})
+    assert_same(model_response, fast_response)
+    assert len(fast_response.json()["items"]) == 2
+
+
+def test_enrollments_match_response_model(client, monkeypatch, seeded):
+    headers = seeded["student"]["headers"]
+    model_response, fast_response = both_modes(client, monkeypatch, "/users/me/enrollments", headers=headers)
+    assert_same(model_response, fast_response)
+    assert [list(row) for row in fast_response.json()] == [["username", "course_name", "course_code", "lecturer_id"]] * 3
+
+    lecturer_headers = seeded["lecturer"]["headers"]
+    model_response, fast_response = both_modes(client, monkeypatch, "/users/me/enrollments", headers=lecturer_headers)
+    assert model_response.status_code == 404
+    assert_same(model_response, fast_response)
@@ -0,0 +1,111 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+import database
+import model
+import storage
+from conftest import make_course, make_user
+
+
+@pytest.fixture
+def assignment(client, db, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "SUBMISSION_STORAGE_DIR", str(tmp_path / "submissions"))
+    lecturer = make_user(db, "lecturer", role="lecturer")
+    student = make_user(db, "student")
+    course_id = make_course(db, lecturer["user_id"], "CSC101")
+    db.add(model.Enrollment(user_id=student["user_id"], course_id=course_id))
+    db_assignment = model.Assignment(
+        course_id=course_id, lecturer_id=lecturer["user_id"], assignment_title="Essay",
+        due_date=datetime.utcnow() + timedelta(days=7),
+    )
+    db.add(db_assignment)
+    db.commit()
+    return {"assignment_id": db_assignment.assignment_id, "student": student, "lecturer": lecturer}
+
+
+def stored_files(root) -> list[str]:
+    return [name for _, _, names in os.walk(root) for name in names]
+
+
+def test_upload_is_content_addressed_and_downloadable(client, assignment):
+    content = b"hello world\n" * 1000
+    path = f"/assignments/{assignment['assignment_id']}/submissions"
+    response = client.post(path, headers=assignment["student"]["headers"], files={"file": ("essay.txt", content, "text/plain")})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["file_sha256"] == hashlib.sha256(content).hexdigest()
+    assert body["size"] == len(content)
+    assert body["filename"] == "essay.txt"
+
+    # Resubmitting the same bytes stores nothing new
+    client.post(path, headers=assignment["student"]["headers"], files={"file": ("again.txt", content, "text/plain")})
+    assert stored_files(storage.SUBMISSION_STORAGE_DIR) == [body["file_sha256"]]
+
+    download = client.get(f"/submissions/{body['submission_id']}/download", headers=assignment["lecturer"]["headers"])
+    assert download.status_code == 200
+    assert download.content == content
+
+
+def test_oversized_upload_is_cut_off(client, assignment, monkeypatch):
+    monkeypatch.setattr(storage, "MAX_SUBMISSION_BYTES", 1000)
+    path = f"/assignments/{assignment['assignment_id']}/submissions"
+    # Under the Content-Length cutoff (file limit plus multipart overhead), over the file limit
+    response = client.post(path, headers=assignment["student"]["headers"], files={"file": ("big.bin", b"x" * 5000)})
+    assert response.status_code == 413
+    assert stored_files(storage.SUBMISSION_STORAGE_DIR) == []
+
+
+def test_oversized_content_length_is_refused_before_reading(client, assignment, monkeypatch):
+    monkeypatch.setattr(storage, "MAX_SUBMISSION_BYTES", 1000)
+    monkeypatch.setattr(storage, "MULTIPART_OVERHEAD_BYTES", 100)
+    path = f"/assignments/{assignment['assignment_id']}/submissions"
+    response = client.post(path, headers=assignment["student"]["headers"], files={"file": ("big.bin", b"x" * 5000)})
+    assert response.status_code == 413
+    assert not os.path.exists(storage.SUBMISSION_STORAGE_DIR)
+
+
+def test_upload_without_file_part_is_rejected(client, assignment):
+    path = f"/assignments/{assignment['assignment_id']}/submissions"
+    response = client.post(path, headers=assignment["student"]["headers"], files={"other": ("a.txt", b"data")})
+    assert response.status_code == 400
+
+
+def test_resubmission_replaces_the_row_and_keeps_the_old_blob(client, db, assignment):
+    path = f"/assignments/{assignment['assignment_id']}/submissions"
+    headers = assignment["student"]["headers"]
+    first = client.post(path, headers=headers, files={"file": ("v1.txt", b"first draft", "text/plain")}).json()
+    second = client.post(path, headers=headers, files={"file": ("v2.txt", b"final draft", "text/plain")}).json()
+    assert second["submission_id"] == first["submission_id"]
+    assert (second["filename"], second["size"]) == ("v2.txt", len(b"final draft"))
+    assert db.query(model.Submission).count() == 1
+    assert sorted(stored_files(storage.SUBMISSION_STORAGE_DIR)) == sorted([first["file_sha256"], second["file_sha256"]])
+
+
+def test_concurrent_resubmission_updates_instead_of_failing(client, db, assignment):
+    # Another request stores a submission between this one's checks and its write
+    raced = []
+
+    def submit_first(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO submissions") and not raced:
+            raced.append(True)
+            cursor.execute(
+                "INSERT INTO submissions (assignment_id, user_id, file_sha256, filename, content_type, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (assignment["assignment_id"], assignment["student"]["user_id"], "0" * 64, "other.txt", "text/plain", 1),
+            )
+
+    event.listen(database.engine, "before_cursor_execute", submit_first)
+    try:
+        response = client.post(
+            f"/assignments/{assignment['assignment_id']}/submissions",
+            headers=assignment["student"]["headers"], files={"file": ("essay.txt", b"essay", "text/plain")},
+        )
+    finally:
+        event.remove(database.engine, "before_cursor_execute", submit_first)
+    assert raced
+    assert response.status_code == 200
+    assert response.json()["file_sha256"] == hashlib.sha256(b"essay").hexdigest()
+    assert db.query(model.Submission).count() == 1
@@ -0,0 +1,46 @@
+from cache import user_cache
+from conftest import make_user
+
+
+def cache_stats(client) -> dict:
+    response = client.get("/metrics/user-cache")
+    assert response.status_code == 200
+    return response.json()
+
+
+def update(client, headers: dict, username: str, email: str):
+    body = {"username": username, "full_name": username.title(), "email": email}
+    return client.put("/users/me", json=body, headers=headers)
+
+
+def test_email_change_is_seen_by_the_next_request(client, db):
+    alice = make_user(db, "alice")
+    assert client.get("/users/me/enrollments", headers=alice["headers"]).status_code == 404
+    assert user_cache.get("alice").email == "alice@example.com"
+
+    response = update(client, alice["headers"], "alice", "alice@new.example.com")
+    assert response.status_code == 200
+    assert response.json()["email"] == "alice@new.example.com"
+    # The cached identity was dropped, so the next request reloads it
+    assert user_cache.get("alice") is None
+    assert client.get("/users/me/enrollments", headers=alice["headers"]).status_code == 404
+    assert user_cache.get("alice").email == "alice@new.example.com"
+
+
+def test_stats_count_hits_and_misses(client, db):
+    alice = make_user(db, "alice")
+    bob = make_user(db, "bob")
+    assert cache_stats(client)["hits"] == cache_stats(client)["misses"] == 0
+
+    for headers in (alice["headers"], alice["headers"], bob["headers"]):
+        client.get("/users/me/enrollments", headers=headers)
+    stats = cache_stats(client)
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
+    assert stats["hit_ratio"] == 1 / 3
+
+    # Authenticating the update is a hit; it then evicts alice, so her next request misses
+    assert update(client, alice["headers"], "alice", "alice@new.example.com").status_code == 200
+    client.get("/users/me/enrollments", headers=alice["headers"])
+    client.get("/users/me/enrollments", headers=bob["headers"])
+    stats = cache_stats(client)
+    assert (stats["hits"], stats["misses"], stats["size"]) == (3, 3, 2)